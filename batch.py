@@ -0,0 +1,133 @@
+# ---------------------------------------------
+# Glamerio batch runner - batch.py
+# Runs many .gl scripts across a pool of worker processes. Each worker
+# imports the lexer/parser/engines once and keeps a warm Interpreter that
+# is reset() before every script, so scripts get isolated state without
+# paying Python startup per file. stdout of every script is captured and
+# the results are printed (or written) as a JSON summary.
+#
+# Usage: python batch.py DIR_OR_MANIFEST [--workers N] [--engine ast|vm]
+#                        [--no-cache] [--no-optimize] [--summary FILE]
+# A manifest is a text file with one script path per line (relative to
+# the manifest); blank lines and lines starting with '#' are skipped.
+# ---------------------------------------------
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import CACHE_DIR
+from main import ENGINES, load_program
+import interpreter
+
+
+def collect_scripts(target):
+    if os.path.isdir(target):
+        scripts = []
+        for root, dirs, files in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d != CACHE_DIR)
+            scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.gl'))
+        return scripts
+    base = os.path.dirname(os.path.abspath(target))
+    with open(target, "r", encoding="utf-8") as f:
+        entries = [line.strip() for line in f]
+    return [os.path.join(base, entry) for entry in entries if entry and not entry.startswith('#')]
+
+
+# ----------------------
+# Worker side
+# ----------------------
+_settings = None
+_interp = None
+
+
+def _init_worker(engine, use_cache, optimized):
+    global _settings, _interp
+    _settings = (ENGINES[engine], use_cache, optimized)
+    # Script'ler zaten paralel koşuyor: 'parallel for' döngüleri worker içinde sıralı çalışır
+    _interp = interpreter.Interpreter(parallel='serial')
+    # Batch script'leri stdin okuyamaz: input() EOFError ile hata olarak raporlanır
+    sys.stdin = io.StringIO()
+
+
+def run_script(path):
+    run, use_cache, optimized = _settings
+    captured = io.StringIO()
+    result = {'path': path, 'status': 'ok', 'error': None}
+    start = time.perf_counter()
+    # Script'in stdout'a yazdığı her şey yakalanır
+    with contextlib.redirect_stdout(captured):
+        try:
+            ast = load_program(path, use_cache, optimized)
+            _interp.reset()
+            _interp.output = interpreter.OutputSink(captured)
+            run(ast, _interp)
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    result['stdout'] = captured.getvalue()
+    return result
+
+
+# ----------------------
+# Driver
+# ----------------------
+def run_batch(paths, engine='ast', workers=None, use_cache=True, optimized=True):
+    # Results come back in the order of paths
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(engine, use_cache, optimized)) as pool:
+        return list(pool.map(run_script, paths, chunksize=chunksize))
+
+
+def summarize(results, engine, workers, seconds):
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    return {
+        'engine': engine,
+        'workers': workers,
+        'scripts': len(results),
+        'ok': len(results) - failed,
+        'failed': failed,
+        'seconds': round(seconds, 6),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='batch.py', description='Run many Glamerio scripts in parallel')
+    arg_parser.add_argument('target', metavar='DIR_OR_MANIFEST',
+                            help='directory of .gl files or a manifest listing them')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='worker processes (default: number of CPUs)')
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default='ast',
+                            help='execution engine (default: ast; vm is a slower reference VM)')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='always re-parse instead of using __glamcache__')
+    arg_parser.add_argument('--no-optimize', action='store_true',
+                            help='skip constant folding and dead-branch pruning')
+    arg_parser.add_argument('--summary', metavar='FILE',
+                            help='write the JSON summary to FILE instead of stdout')
+    args = arg_parser.parse_args(argv)
+
+    paths = collect_scripts(args.target)
+    start = time.perf_counter()
+    results = run_batch(paths, args.engine, args.workers, not args.no_cache, not args.no_optimize)
+    summary = summarize(results, args.engine, args.workers, time.perf_counter() - start)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(summary, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
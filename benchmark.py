@@ -0,0 +1,553 @@
+# ---------------------------------------------
+# Glamerio micro benchmarks - benchmark.py
+# Usage: python benchmark.py [name ...]   (no name: run all)
+# ---------------------------------------------
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+
+import batch
+import interpreter
+from lexer import lexer, tokenize
+from parser import TokenStream, parse_program
+from glam_ast import *
+from optimizer import optimize
+from main import ENGINES
+
+
+def run_source(code, engine='ast', stdout=None, optimized=False):
+    with contextlib.redirect_stdout(stdout if stdout is not None else io.StringIO()):
+        ast = parse_program(lexer(code))
+        if optimized:
+            ast = optimize(ast)
+        interp = interpreter.Interpreter()
+        start = time.perf_counter()
+        ENGINES[engine](ast, interp)
+        return time.perf_counter() - start
+
+
+def report(label, seconds, per=None):
+    if per:
+        print(f"  {label:<40} {seconds * 1e9 / per:10.1f} ns/iter")
+    else:
+        print(f"  {label:<40} {seconds * 1000:10.1f} ms")
+
+
+# ----------------------
+# Benchmarks
+# ----------------------
+
+def bench_literals():
+    # Per-visit cost of a literal: the old string decode vs the pre-decoded value
+    print("literals")
+    n = 1_000_000
+
+    def decode(value):
+        if value == 'null':
+            return None
+        elif value == 'True':
+            return True
+        elif value == 'False':
+            return False
+        return float(value) if '.' in value else int(value)
+
+    raw = LiteralNode('1')
+    decoded = LiteralNode(1)
+    report("decode '1' on every visit", timeit.timeit(lambda: decode(raw.value), number=n), n)
+    report("read pre-decoded value", timeit.timeit(lambda: decoded.value, number=n), n)
+    loop = "int i = 0; while (i < 200000) { i = i + 1; }"
+    for engine in ENGINES:
+        report(f"i = i + 1 loop, 200k iterations ({engine})", run_source(loop, engine))
+
+
+CALLS_PROGRAM = '''
+fn fib(n) {
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+fn ack(m, n) {
+    if (m == 0) { return n + 1; }
+    if (n == 0) { return ack(m - 1, 1); }
+    return ack(m - 1, ack(m, n - 1));
+}
+print(fib(20));
+print(ack(2, 60));
+'''
+
+
+def bench_calls():
+    # Recursion-heavy code: dominated by call overhead and local variable access
+    print("calls (fib(20) + ack(2, 60))")
+    for engine in ENGINES:
+        report(engine, run_source(CALLS_PROGRAM, engine))
+
+
+MEMO_PROGRAM = '''
+fn %sfib(n) {
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+print(fib(24));
+'''
+
+
+def bench_memo():
+    # Exponential recursion with repeating arguments: plain vs 'fn memo'
+    print("memo (fib(24))")
+    for engine in ENGINES:
+        report(f"fn ({engine})", run_source(MEMO_PROGRAM % '', engine))
+        report(f"fn memo ({engine})", run_source(MEMO_PROGRAM % 'memo ', engine))
+
+
+ARITHMETIC_PROGRAM = '''
+int i = 0;
+int acc = 0;
+float x = 0.5;
+while (i < 100000) {
+    acc = acc + i * 3 - i / 2;
+    x = x * 1.0001 + 0.25;
+    i = i + 1;
+}
+print(acc);
+print(x);
+'''
+
+
+def bench_arithmetic():
+    # Numeric kernel: int/int and float/float operators in a hot loop
+    print("arithmetic (100k iterations)")
+    for engine in ENGINES:
+        report(engine, run_source(ARITHMETIC_PROGRAM, engine))
+
+
+COUNTED_LOOP_PROGRAM = '''
+int total = 0;
+for (int i = 0; i < 200000; i = i + 1) {
+    total = total + i;
+}
+fn sum(n) {
+    int t = 0;
+    for (int j = 0; j < n; j = j + 1) { t = t + j; }
+    return t;
+}
+print(total + sum(200000));
+'''
+
+
+def bench_counted_loop():
+    # Classic for loops, at top level and inside a function
+    print("counted loop (2 x 200k iterations)")
+    for engine in ENGINES:
+        report(engine, run_source(COUNTED_LOOP_PROGRAM, engine))
+
+
+RANGE_PROGRAM = '''
+int s = 0;
+for (x in range(0, 1000000)) { s = s + x; }
+print(s);
+'''
+
+
+def bench_range():
+    # For-each over a lazy range: time and peak memory should not depend on a list
+    print("range (for-each over 1M indices)")
+    for engine in ENGINES:
+        seconds = run_source(RANGE_PROGRAM, engine)
+        tracemalloc.start()
+        run_source(RANGE_PROGRAM, engine)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {engine:<40} {seconds * 1000:10.1f} ms {peak / 1e6:8.3f} MB peak")
+
+
+LOGICAL_PROGRAM = '''
+fn heavy(n) {
+    return n * 2 > 1;
+}
+int i = 0;
+int hits = 0;
+while (i < 100000 && i >= 0) {
+    if (i < 0 && heavy(i)) { hits = hits + 1; }
+    if (i >= 0 || heavy(i)) { hits = hits + 1; }
+    i = i + 1;
+}
+print(hits);
+'''
+
+
+def bench_logical():
+    # Guards whose right operand is a call that short-circuiting skips
+    print("logical (100k iterations, 3 guards)")
+    for engine in ENGINES:
+        report(engine, run_source(LOGICAL_PROGRAM, engine))
+
+
+def bench_returns():
+    # Returning through block -> if -> block closures: raised exception vs completion signal
+    print("returns")
+    n = 300_000
+
+    class Return(Exception):
+        def __init__(self, value):
+            self.value = value
+
+    def raise_return():
+        raise Return(1)
+
+    def raise_if():
+        raise_return()
+
+    def raise_block():
+        raise_if()
+
+    def call_with_exception():
+        try:
+            raise_block()
+        except Return as r:
+            return r.value
+
+    def signal_return():
+        return interpreter.ReturnSignal(1)
+
+    def signal_if():
+        return signal_return()
+
+    def signal_block():
+        signal = signal_if()
+        if signal is not None:
+            return signal
+
+    def call_with_signal():
+        signal = signal_block()
+        return signal.value if signal is not None else None
+
+    report("ReturnException (before)", timeit.timeit(call_with_exception, number=n), n)
+    report("ReturnSignal (after)", timeit.timeit(call_with_signal, number=n), n)
+    calls = 21891 + 7625   # fib(20) and ack(2, 60) invocations
+    for engine in ENGINES:
+        seconds = run_source(CALLS_PROGRAM, engine)
+        print(f"  {'calls program (' + engine + ')':<40} {calls / seconds:10.0f} calls/s")
+
+
+OBJECTS_PROGRAM = '''
+class Point {
+    int x = 0;
+    int y = 0;
+    str label = "point";
+    private int id = 0;
+    array tags = [];
+    constructor(a, b) { this.x = a; this.y = b; }
+    int sum() { return this.x + this.y; }
+    void move(dx) { this.x = this.x + dx; }
+}
+int i = 0;
+while (i < 100000) {
+    p = new Point(i, 1);
+    i = i + 1;
+}
+print(i);
+'''
+
+
+def bench_objects():
+    # Allocation-heavy code: 100k instantiations with a constructor
+    print("objects (100k new Point(...))")
+    for engine in ENGINES:
+        report(engine, run_source(OBJECTS_PROGRAM, engine))
+
+
+PRIVATE_PROGRAM = '''
+class Counter {
+    %s int count = 0;
+    void tick() { this.count = this.count + 1; }
+    int get() { return this.count; }
+}
+c = new Counter();
+int i = 0;
+while (i < 5000) {
+    c.tick();
+    i = i + c.get() - c.get() + 1;
+}
+print(c.get());
+'''
+
+
+def bench_private():
+    # Member access from methods: private fields should cost the same as public ones
+    print("private access (5k iterations, 3 accesses each)")
+    for engine in ENGINES:
+        report(f"public ({engine})", run_source(PRIVATE_PROGRAM % '', engine))
+        report(f"private ({engine})", run_source(PRIVATE_PROGRAM % 'private', engine))
+
+
+METHODS_PROGRAM = '''
+class Circle { int r = 2; int area() { return this.r * this.r * 3; } }
+class Square { int s = 3; int area() { return this.s * this.s; } }
+class Tri { int b = 4; int h = 5; int area() { return this.b * this.h / 2; } }
+shapes = %s;
+int total = 0;
+int i = 0;
+while (i < 60000) {
+    for (sh in shapes) { total = total + sh.area(); }
+    i = i + 3;
+}
+print(total);
+'''
+
+
+def bench_methods():
+    # Method dispatch and property reads at one call site, one class vs three
+    print("methods (60k calls of sh.area())")
+    for label, shapes in (('monomorphic', '[new Circle(), new Circle(), new Circle()]'),
+                          ('polymorphic', '[new Circle(), new Square(), new Tri()]')):
+        for engine in ENGINES:
+            report(f"{label} ({engine})", run_source(METHODS_PROGRAM % shapes, engine))
+
+
+def bench_print():
+    # Print-heavy script writing to a line-buffered stream (like a tty or a log pipe)
+    print("print (200k lines to a line-buffered stream)")
+    loop = "int i = 0; while (i < 200000) { print(i); i = i + 1; }"
+    with open(os.devnull, 'w', buffering=1) as sink:
+        for engine in ENGINES:
+            report(engine, run_source(loop, engine, sink))
+
+
+CONSTANTS_PROGRAM = '''
+int i = 0;
+int total = 0;
+while (i < 100000) {
+    total = total + 60 * 60 * 24 - 2 ^ 10;
+    str label = "item" + "-" + 1;
+    if (False) { print("debug"); }
+    i = i + 1;
+}
+print(total);
+'''
+
+
+def bench_constants():
+    # Loop body full of constant subexpressions and a disabled debug branch
+    print("constants (100k iterations)")
+    for engine in ENGINES:
+        report(f"unoptimized ({engine})", run_source(CONSTANTS_PROGRAM, engine))
+        report(f"optimized ({engine})", run_source(CONSTANTS_PROGRAM, engine, optimized=True))
+
+
+def generate_program(lines):
+    # Synthetic source: a mix of declarations, loops and function calls
+    chunk = [
+        'int a{n} = {n} * 2 + 1;',
+        'str s{n} = "value " + a{n};',
+        'while (a{n} > 0) {{ a{n} = a{n} - 1; }}',
+        'print(s{n});',
+    ]
+    return '\n'.join(chunk[i % len(chunk)].format(n=i // len(chunk)) for i in range(lines))
+
+
+def bench_lexer():
+    # Lexing time should grow linearly with the number of lines
+    print("lexer")
+    for lines in (6_250, 12_500, 25_000, 50_000):
+        code = generate_program(lines)
+        start = time.perf_counter()
+        lexer(code)
+        seconds = time.perf_counter() - start
+        print(f"  {lines:>6} lines {seconds * 1000:10.1f} ms {seconds * 1e6 / lines:8.2f} us/line")
+
+
+def generate_expressions(lines):
+    # Expression-dense source: every line mixes all precedence levels
+    line = 'int e{n} = (a + {n}) * 2 - b / 3 ^ 2 ^ 1 < c + {n} and d == 1 or e != f && g >= h * 4 || {n} <= 1;'
+    return '\n'.join(line.format(n=n) for n in range(lines))
+
+
+def bench_parser():
+    # Parsing time only: tokens are produced up front
+    print("parser")
+    for label, generate in (('mixed', generate_program), ('expressions', generate_expressions)):
+        for lines in (10_000, 40_000):
+            tokens = lexer(generate(lines))
+            start = time.perf_counter()
+            parse_program(tokens)
+            seconds = time.perf_counter() - start
+            print(f"  {label:<12} {lines:>6} lines {seconds * 1000:10.1f} ms {seconds * 1e6 / lines:8.2f} us/line")
+
+
+def bench_token_memory():
+    # Peak memory of holding every token vs pulling them through a TokenStream
+    print("token memory")
+    for lines in (12_500, 50_000):
+        code = generate_program(lines)
+        tracemalloc.start()
+        tokens = lexer(code)
+        list_peak = tracemalloc.get_traced_memory()[1]
+        del tokens
+        tracemalloc.stop()
+        tracemalloc.start()
+        stream = TokenStream(tokenize(code))
+        while stream.peek():
+            stream.consume()
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {lines:>6} lines  list {list_peak / 1e6:8.1f} MB  stream {stream_peak / 1e6:8.3f} MB")
+
+
+def count_nodes(nodes):
+    stack = list(nodes)
+    count = 0
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(iter_child_nodes(node))
+    return count
+
+
+def bench_ast_memory():
+    # Memory held by the parsed AST of a large generated program
+    print("ast memory")
+    for lines in (12_500, 50_000):
+        code = generate_program(lines)
+        tracemalloc.start()
+        ast = parse_program(tokenize(code))
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        nodes = count_nodes(ast)
+        print(f"  {lines:>6} lines {nodes:>8} nodes {size / 1e6:8.1f} MB {size / nodes:8.1f} B/node")
+
+
+ISOLATION_PROGRAM = '''
+class Counter { int n = 0; }
+fn bump(c, k) { c.n = c.n + k; return c.n; }
+c = new Counter();
+int total = 0;
+for (int i = 0; i < 2000; i = i + 1) { total = total + bump(c, i); }
+print(total);
+'''
+
+
+def bench_interpreters():
+    # Independent Interpreter objects: warm reuse, and several running in threads
+    print("interpreters (8 runs)")
+    ast = parse_program(lexer(ISOLATION_PROGRAM))
+    runs = 8
+    for engine, run in ENGINES.items():
+        outputs = []
+
+        def run_one(interp):
+            sink = io.StringIO()
+            interp.output = interpreter.OutputSink(sink)
+            run(ast, interp)
+            outputs.append(sink.getvalue())
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_one(interpreter.Interpreter())
+        report(f"fresh interpreter per run ({engine})", time.perf_counter() - start)
+        warm = interpreter.Interpreter()
+        start = time.perf_counter()
+        for _ in range(runs):
+            warm.reset()
+            run_one(warm)
+        report(f"one warm interpreter, reset ({engine})", time.perf_counter() - start)
+        threads = [threading.Thread(target=run_one, args=(interpreter.Interpreter(),)) for _ in range(runs)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report(f"{runs} interpreters in threads ({engine})", time.perf_counter() - start)
+        assert len(set(outputs)) == 1 and len(outputs) == 3 * runs, "interpreters leaked state"
+
+
+PARALLEL_PROGRAM = '''
+fn score(n) {
+    int total = 0;
+    for (int i = 0; i < 40000; i = i + 1) { total = total + i * n - total / 2; }
+    return total;
+}
+array results = [0, 0, 0, 0, 0, 0, 0, 0];
+%sfor (k in range(0, 8)) { results[k] = score(k); }
+print(results);
+'''
+
+
+def bench_parallel():
+    # CPU-bound pure function over 8 elements: plain for-each vs parallel for-each backends
+    print(f"parallel for-each (8 x 40k iterations, {os.cpu_count()} CPUs)")
+    plain = parse_program(lexer(PARALLEL_PROGRAM % ''))
+    parallel = parse_program(lexer(PARALLEL_PROGRAM % 'parallel '))
+    for label, ast, backend in (('for', plain, 'serial'), ('parallel for, serial', parallel, 'serial'),
+                                ('parallel for, thread', parallel, 'thread'),
+                                ('parallel for, process', parallel, 'process')):
+        sink = io.StringIO()
+        interp = interpreter.Interpreter(interpreter.OutputSink(sink), parallel=backend)
+        start = time.perf_counter()
+        try:
+            interpreter.run(ast, interp)
+        finally:
+            interp.close()
+        report(label, time.perf_counter() - start)
+        if label == 'for':
+            expected = sink.getvalue()
+        assert sink.getvalue() == expected
+
+
+def bench_batch():
+    # Many small scripts: one main.py process per script vs the warm batch pool
+    print("batch (48 small scripts)")
+    scripts = 48
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(scripts):
+            path = os.path.join(directory, f"script{i:03d}.gl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"int total = 0;\nfor (int i = 0; i < {1000 + i}; i = i + 1) {{ total = total + i; }}\nprint(total);\n")
+            paths.append(path)
+        main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+        start = time.perf_counter()
+        for path in paths:
+            subprocess.run([sys.executable, main_py, '--no-cache', path], check=True, stdout=subprocess.DEVNULL)
+        report("python main.py per script", time.perf_counter() - start)
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            results = batch.run_batch(paths, workers=workers, use_cache=False)
+            report(f"batch.run_batch, {workers} workers", time.perf_counter() - start)
+            assert all(result['status'] == 'ok' for result in results)
+
+
+BENCHMARKS = {
+    'literals': bench_literals,
+    'calls': bench_calls,
+    'returns': bench_returns,
+    'memo': bench_memo,
+    'arithmetic': bench_arithmetic,
+    'counted-loop': bench_counted_loop,
+    'range': bench_range,
+    'logical': bench_logical,
+    'objects': bench_objects,
+    'private': bench_private,
+    'methods': bench_methods,
+    'print': bench_print,
+    'constants': bench_constants,
+    'lexer': bench_lexer,
+    'parser': bench_parser,
+    'token-memory': bench_token_memory,
+    'ast-memory': bench_ast_memory,
+    'interpreters': bench_interpreters,
+    'batch': bench_batch,
+    'parallel': bench_parallel,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,103 @@
+# ---------------------------------------------
+# Glamerio AST cache - cache.py
+# Parsed programs are pickled into a __glamcache__ directory next to the
+# script, like __pycache__. Entries are named <script>.<fingerprint>.<hash>.ast
+# after an interpreter fingerprint (Python version + lexer/parser/AST
+# sources) and the source hash, so edits to either the script or the
+# interpreter invalidate them. Writing an entry removes the script's older
+# entries for the same interpreter only; other interpreters sharing the
+# directory keep theirs, up to MAX_FINGERPRINTS per script.
+# ---------------------------------------------
+
+import hashlib
+import os
+import pickle
+import sys
+
+from lexer import tokenize
+from parser import parse_program
+
+CACHE_DIR = '__glamcache__'
+MAX_FINGERPRINTS = 4    # interpreter versions whose entries a script keeps
+
+_fingerprint = None
+
+
+def interpreter_fingerprint():
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256(sys.version.encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for module in ('glam_ast.py', 'lexer.py', 'parser.py'):
+            with open(os.path.join(here, module), 'rb') as f:
+                digest.update(f.read())
+        _fingerprint = digest.hexdigest()[:16]
+    return _fingerprint
+
+
+def cache_path(filename, code):
+    digest = hashlib.sha256(code.encode('utf-8')).hexdigest()[:24]
+    directory = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR)
+    return os.path.join(directory, f"{os.path.basename(filename)}.{interpreter_fingerprint()}.{digest}.ast")
+
+
+def load_ast(path):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # Eksik veya bozuk cache: yeniden parse edilir
+        return None
+
+
+# Drop the script's entries for older sources of this interpreter, and the
+# entries of the least recently written interpreters beyond MAX_FINGERPRINTS
+def prune_entries(directory, name):
+    script, fingerprint, _, _ = name.rsplit('.', 3)
+    written = {}    # fingerprint -> newest mtime of its entries
+    for entry in os.listdir(directory):
+        if entry == name or not entry.endswith('.ast'):
+            continue
+        entry_path = os.path.join(directory, entry)
+        if entry.rsplit('.', 2)[0] == script:
+            # <script>.<hash>.ast: written before the fingerprint was in the name
+            os.remove(entry_path)
+            continue
+        parts = entry.rsplit('.', 3)
+        if len(parts) != 4 or parts[0] != script:
+            continue
+        if parts[1] == fingerprint:
+            os.remove(entry_path)
+        else:
+            written[parts[1]] = max(written.get(parts[1], 0), os.path.getmtime(entry_path))
+    stale = sorted(written, key=written.get, reverse=True)[MAX_FINGERPRINTS - 1:]
+    for entry in os.listdir(directory):
+        parts = entry.rsplit('.', 3)
+        if len(parts) == 4 and parts[0] == script and parts[3] == 'ast' and parts[1] in stale:
+            os.remove(os.path.join(directory, entry))
+
+
+def store_ast(path, ast):
+    directory, name = os.path.split(path)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump(ast, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        prune_entries(directory, name)
+    except (OSError, RecursionError, pickle.PicklingError):
+        # Cache is best effort: read-only directories or very deep ASTs just skip it
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def parse_cached(filename, code):
+    path = cache_path(filename, code)
+    ast = load_ast(path)
+    if ast is None:
+        ast = parse_program(tokenize(code))
+        store_ast(path, ast)
+    return ast
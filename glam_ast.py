@@ -1,9 +1,15 @@
+# AST (Abstract Syntax Tree) Node Definitions
+# Every node declares __slots__: no per-node __dict__ and faster field access
+
 class MapNode:
+    __slots__ = ('pairs',)
+
     def __init__(self, pairs):
         self.pairs = pairs
-# AST (Abstract Syntax Tree) Node Definitions
 
 class VarDeclarationNode:
+    __slots__ = ('var_type', 'name', 'value', 'is_static', 'is_private')
+
     def __init__(self, var_type, name, value, is_static=False, is_private=False):
         self.var_type = var_type
         self.name = name
@@ -12,67 +18,95 @@ class VarDeclarationNode:
         self.is_private = is_private
 
 class PrintNode:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
+# value is already a Python int, float, bool or None (decoded by the parser)
 class LiteralNode:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class StringNode:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class IdentifierNode:
+    __slots__ = ('name', 'line', 'column')
+
     def __init__(self, name, line=None, column=None):
         self.name = name
         self.line = line
         self.column = column
 
 class BinaryOpNode:
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
         self.right = right
 
 class InputNode:
+    __slots__ = ('prompt',)
+
     def __init__(self, prompt):
         self.prompt = prompt
 
 class IfNode:
+    __slots__ = ('condition', 'then_block', 'else_block')
+
     def __init__(self, condition, then_block, else_block=None):
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
 
 class WhileNode:
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
 
 class BlockNode:
+    __slots__ = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
 
 class FunctionDefNode:
-    def __init__(self, name, params, body, is_static=False, is_private=False, is_constructor=False):
+    __slots__ = ('name', 'params', 'body', 'is_static', 'is_private', 'is_constructor', 'memo')
+
+    def __init__(self, name, params, body, is_static=False, is_private=False, is_constructor=False, memo=None):
         self.name = name
         self.params = params
         self.body = body
         self.is_static = is_static
         self.is_private = is_private
         self.is_constructor = is_constructor
+        self.memo = memo    # 'fn memo': max cached results, None if not memoized
 
 class FunctionCallNode:
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args
 
 class ReturnNode:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class ForNode:
+    __slots__ = ('init', 'condition', 'increment', 'body')
+
     def __init__(self, init, condition, increment, body):
         self.init = init
         self.condition = condition
@@ -80,38 +114,99 @@ class ForNode:
         self.body = body
 
 class ForEachNode:
-    def __init__(self, var_type, var_name, iterable, body):
+    __slots__ = ('var_type', 'var_name', 'iterable', 'body', 'parallel')
+
+    def __init__(self, var_type, var_name, iterable, body, parallel=False):
         self.var_type = var_type
         self.var_name = var_name
         self.iterable = iterable
         self.body = body
+        self.parallel = parallel    # 'parallel for (...)': iterations run on a worker pool
 
 class TryCatchNode:
+    __slots__ = ('try_block', 'catch_var', 'catch_block')
+
     def __init__(self, try_block, catch_var, catch_block):
         self.try_block = try_block
         self.catch_var = catch_var
         self.catch_block = catch_block
 
 class ArrayNode:
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         self.elements = elements
 
 class IndexAccessNode:
+    __slots__ = ('list_expr', 'index_expr')
+
     def __init__(self, list_expr, index_expr):
         self.list_expr = list_expr
         self.index_expr = index_expr
 
 class ClassDefNode:
+    __slots__ = ('name', 'body', 'base')
+
     def __init__(self, name, body, base=None):
         self.name = name
         self.body = body
         self.base = base
 
 class ClassInstanceNode:
+    __slots__ = ('class_name',)
+
     def __init__(self, class_name):
         self.class_name = class_name
 
 class NewInstanceNode:
+    __slots__ = ('class_name', 'args')
+
     def __init__(self, class_name, args=None):
         self.class_name = class_name
         self.args = args or []
+
+
+# Child nodes of any AST node, in evaluation order (used by analysis passes)
+def iter_child_nodes(node):
+    if isinstance(node, MapNode):
+        for _, value in node.pairs:
+            yield value
+        return
+    for field in _CHILD_FIELDS.get(type(node), ()):
+        value = getattr(node, field)
+        if isinstance(value, list):
+            yield from value
+        elif value is not None and not isinstance(value, str):
+            yield value
+
+# Replace every child of node in place with func(child) (used by rewriting passes)
+def replace_child_nodes(node, func):
+    if isinstance(node, MapNode):
+        node.pairs = [(key, func(value)) for key, value in node.pairs]
+        return
+    for field in _CHILD_FIELDS.get(type(node), ()):
+        value = getattr(node, field)
+        if isinstance(value, list):
+            setattr(node, field, [func(child) for child in value])
+        elif value is not None and not isinstance(value, str):
+            setattr(node, field, func(value))
+
+_CHILD_FIELDS = {
+    VarDeclarationNode: ('value',),
+    PrintNode: ('value',),
+    BinaryOpNode: ('left', 'right'),
+    InputNode: ('prompt',),
+    IfNode: ('condition', 'then_block', 'else_block'),
+    WhileNode: ('condition', 'body'),
+    BlockNode: ('statements',),
+    FunctionDefNode: ('body',),
+    FunctionCallNode: ('name', 'args'),
+    ReturnNode: ('value',),
+    ForNode: ('init', 'condition', 'increment', 'body'),
+    ForEachNode: ('iterable', 'body'),
+    TryCatchNode: ('try_block', 'catch_block'),
+    ArrayNode: ('elements',),
+    IndexAccessNode: ('list_expr', 'index_expr'),
+    ClassDefNode: ('body',),
+    NewInstanceNode: ('args',),
+}
@@ -4,535 +4,1729 @@
 # - Variables, Print, Input
 # - If / Else, While
 # - Functions, Return
+#
+# Every AST node is compiled once into a Python closure that takes the
+# active scope. run() compiles the whole program up front and then only
+# executes the closures, so the per-visit isinstance dispatch is gone.
+#
+# Top-level code runs against the global memory dict. Function and method
+# bodies are compiled against a FrameLayout that gives every parameter and
+# local a fixed slot, so their closures read and write a preallocated
+# frame list instead of a dict.
+#
+# All program state (globals, functions, classes, output) belongs to an
+# Interpreter object; closures are bound to the interpreter that compiled
+# them, so independent interpreters can run side by side.
 # ---------------------------------------------
 
+import io
+import operator
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from glam_ast import *
 
-memory = {}         # global variables
-functions = {}      # function definitions
-classes = {}        # class definitions (name -> ClassDefNode)
-call_stack = []     # for function calls
+_MISSING = object()
+
+
+# Completion signal: statement closures return None to fall through, or a
+# signal that enclosing blocks and loops hand upwards until the call that
+# owns the frame unwraps it. Much cheaper than raising an exception.
+class ReturnSignal:
+    __slots__ = ('value',)
 
-class ReturnException(Exception):
     def __init__(self, value):
         self.value = value
 
 
-def evaluate(node, local_scope=None):
-    # Map/dictionary literal
-    if isinstance(node, MapNode):
-        scope = local_scope if local_scope is not None else memory
-        d = {}
-        for k, v in node.pairs:
-            d[k] = evaluate(v, scope)
-        return d
-
-    # Map index access: m["key"]
-    if isinstance(node, IndexAccessNode):
-        scope = local_scope if local_scope is not None else memory
-        container = evaluate(node.list_expr, scope)
-        idx = evaluate(node.index_expr, scope)
-        if isinstance(container, dict):
-            return container[idx]
-        return container[idx]
-    # Try-catch error handling
-    if isinstance(node, TryCatchNode):
+# True if running node can end with a signal (a return not nested in a
+# function or class body); only such statements have their result checked
+def completes_abruptly(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ReturnNode):
+            return True
+        if not isinstance(node, (FunctionDefNode, ClassDefNode)):
+            stack.extend(iter_child_nodes(node))
+    return False
+
+
+# Slot assignment for one function body: parameters first, then 'this'
+# for methods, then every other name the body assigns. Unassigned slots
+# hold _MISSING and reads fall back to globals, like the old dict scopes.
+class FrameLayout:
+    def __init__(self, params, body, has_this=False):
+        self.slots = {}
+        for i, param in enumerate(params):
+            self.slots[param] = i
+        self.nparams = len(params)
+        self.has_this = has_this
+        # Parameters of plain functions are always bound on entry (call_function
+        # checks the count), so their reads need no _MISSING check. Methods can
+        # run without a receiver (static calls) or with missing constructor args.
+        self.definite = set() if has_this else set(params)
+        self.size = self.nparams
+        if has_this:
+            self.slots['this'] = self.size
+            self.size += 1
+        for name in assigned_names(body):
+            if name not in self.slots:
+                self.slots[name] = self.size
+                self.size += 1
+
+
+def assigned_names(node):
+    names = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (FunctionDefNode, ClassDefNode)):
+            continue    # own frames (methods) or global scope (field defaults)
+        if isinstance(node, VarDeclarationNode):
+            names.append(node.name)
+        elif isinstance(node, BinaryOpNode) and node.operator == '=' and isinstance(node.left, IdentifierNode):
+            names.append(node.left.name)
+        elif isinstance(node, ForEachNode):
+            names.append(node.var_name)
+        elif isinstance(node, TryCatchNode) and node.catch_var:
+            names.append(node.catch_var)
+        stack.extend(reversed(list(iter_child_nodes(node))))
+    return names
+
+
+# Runtime representation of a compiled function or method
+class Function:
+    def __init__(self, node, body, layout, frame_size=None):
+        self.node = node
+        self.name = node.name
+        self.params = node.params
+        self.body = body
+        self.is_static = node.is_static
+        self.is_private = node.is_private
+        self.is_constructor = node.is_constructor
+        self.layout = layout
+        self.nparams = layout.nparams
+        self.has_this = layout.has_this
+        self.padding = [_MISSING] * ((frame_size or layout.size) - self.nparams - self.has_this)
+        self.code = None    # bytecode, when compiled by vm.py
+        self.memo = None    # MemoCache of a 'fn memo' function
+
+    def make_frame(self, args, this=_MISSING):
+        frame = args[:self.nparams]
+        if len(frame) < self.nparams:
+            frame += [_MISSING] * (self.nparams - len(frame))
+        if self.has_this:
+            frame.append(this)
+        frame += self.padding
+        return frame
+
+
+def compile_function(node, interp, has_this=False):
+    layout = FrameLayout(node.params, node.body, has_this)
+    func = Function(node, compile_node(node.body, layout, interp), layout)
+    if node.memo:
+        memoize(func)
+    return func
+
+
+# Results of a 'fn memo' function, least recently used first. Keys are the
+# argument tuple plus the argument types, so f(1) and f(1.0) stay apart.
+class MemoCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()    # key -> completion signal of the body
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+
+# Class bookkeeping every instance of a class shares with its template
+_INSTANCE_METADATA = frozenset(('__class__', '__methods__', '__private__', '__private_methods__'))
+
+
+# Deep copy of arrays, maps and objects (shared parts stay shared); anything
+# else is returned as is. Objects get copies of their fields only: their
+# class bookkeeping (and so the inline caches keyed on '__methods__') is
+# shared with the original.
+def copy_value(value, copies):
+    if not isinstance(value, (list, dict)):
+        return value
+    copy = copies.get(id(value))
+    if copy is None:
+        if isinstance(value, list):
+            copy = copies[id(value)] = []
+            copy.extend(copy_value(item, copies) for item in value)
+        elif '__class__' in value:
+            copy = copies[id(value)] = {}
+            copy.update((key, item if key in _INSTANCE_METADATA else copy_value(item, copies))
+                        for key, item in value.items())
+        else:
+            copy = copies[id(value)] = {}
+            copy.update((key, copy_value(item, copies)) for key, item in value.items())
+    return copy
+
+
+# Wrap func.body with a MemoCache. Calls with unhashable arguments (arrays,
+# maps, objects) run uncached and count as misses. Cached arrays, maps and
+# objects are copied on the way out so callers cannot change the cache.
+def memoize(func):
+    cache = func.memo = MemoCache(func.node.memo)
+    entries = cache.entries
+    body = func.body
+    nparams = func.nparams
+
+    def fresh(signal):
+        if signal is not None and isinstance(signal.value, (list, dict)):
+            return ReturnSignal(copy_value(signal.value, {}))
+        return signal
+
+    def memo_body(frame):
+        args = frame[:nparams]
+        key = (*args, *map(type, args))
         try:
-            return evaluate(node.try_block, local_scope)
-        except Exception as e:
-            if node.catch_var:
-                # Yeni bir scope ile hata değişkenini ata
-                catch_scope = dict(local_scope) if local_scope else {}
-                catch_scope[node.catch_var] = str(e)
-                return evaluate(node.catch_block, catch_scope)
-            else:
-                return evaluate(node.catch_block, local_scope)
-    # ClassInstanceNode desteği (ileride parser veya başka bir yerde kullanılabilir)
-    # Method ve property'leri ayır: methodlar fonksiyon, property'ler değişken
-    if isinstance(node, ClassInstanceNode):
-        def collect_class_hierarchy(class_name):
-            # Inheritance desteği: üst sınıfları sırayla topla
-            hierarchy = []
-            current = classes.get(class_name)
-            while current:
-                hierarchy.append(current)
-                base = getattr(current, 'base', None)
-                if base:
-                    current = classes.get(base)
-                else:
-                    break
-            return hierarchy
+            signal = entries.get(key, _MISSING)
+        except TypeError:
+            cache.misses += 1
+            return body(frame)
+        if signal is _MISSING:
+            cache.misses += 1
+            signal = entries[key] = body(frame)
+            if len(entries) > cache.maxsize:
+                entries.popitem(last=False)
+        else:
+            cache.hits += 1
+            entries.move_to_end(key)
+        return fresh(signal)
+    func.body = memo_body
+    # The VM calls func.code directly; memoized functions must go through body
+    func.code = None
+    return func
 
-        class_def = classes.get(node.class_name)
-        if not class_def:
-            raise Exception(f"Class '{node.class_name}' not defined")
-        instance = {'__class__': node.class_name}
-        methods = {}
-        # Inheritance: base class'lardan property ve methodları sırayla ekle (alt sınıf override eder)
-        for cdef in reversed(collect_class_hierarchy(node.class_name)):
-            for stmt in cdef.body.statements:
-                # Access control: private property/method sadece this içinden erişilebilir
-                is_private = hasattr(stmt, 'is_private') and stmt.is_private
-                if isinstance(stmt, VarDeclarationNode):
-                    if stmt.name not in instance:
-                        instance[stmt.name] = evaluate(stmt.value, memory)
-                    if is_private:
-                        if '__private__' not in instance:
-                            instance['__private__'] = set()
-                        instance['__private__'].add(stmt.name)
-                elif isinstance(stmt, FunctionDefNode):
-                    methods[stmt.name] = stmt
-                    if is_private:
-                        if '__private_methods__' not in instance:
-                            instance['__private_methods__'] = set()
-                        instance['__private_methods__'].add(stmt.name)
-        instance['__methods__'] = methods
-        # Constructor çağrısı (init veya constructor methodu varsa)
-        ctor = methods.get('constructor') or methods.get('init')
-        if ctor:
-            local = {'this': instance}
-            # Parametre yoksa boş çağır
+
+def call_function(func, args, this=_MISSING):
+    if len(args) < func.nparams:
+        raise Exception(f"Function '{func.name}' expects {func.nparams} arguments, got {len(args)}")
+    signal = func.body(func.make_frame(args, this))
+    return signal.value if signal is not None else None
+
+
+# ----------------------
+# Output
+# ----------------------
+
+# print çıktısı satır satır yazılmaz: parçalar biriktirilir ve buffer dolunca,
+# input() öncesinde ve program sonunda tek bir write ile akışa verilir.
+# stream None ise o anki sys.stdout kullanılır; buffer_size=0 her satırı hemen yazar.
+class OutputSink:
+    def __init__(self, stream=None, buffer_size=65536):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.pending = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.pending += len(text)
+        if self.pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.parts:
+            stream.write(''.join(self.parts))
+            self.parts.clear()
+            self.pending = 0
+        stream.flush()
+
+
+# ----------------------
+# Runtime helpers
+# ----------------------
+
+# Otomatik tip dönüşümü: input'tan gelen string sayısal ise dönüştür
+def auto_convert(val, other):
+    if isinstance(val, str):
+        if isinstance(other, int):
             try:
-                evaluate(ctor.body, local)
-            except ReturnException as r:
+                return int(val)
+            except Exception:
                 pass
-        return instance
-    # Class definition
-    if isinstance(node, ClassDefNode):
-        # Static property/method desteği: class objesine ekle
-        static_props = {}
-        static_methods = {}
-        for stmt in node.body.statements:
-            # Static property: var static int x = 5; veya static int x = 5;
-            if hasattr(stmt, 'is_static') and stmt.is_static:
-                if isinstance(stmt, VarDeclarationNode):
-                    static_props[stmt.name] = evaluate(stmt.value, memory)
-                elif isinstance(stmt, FunctionDefNode):
-                    static_methods[stmt.name] = stmt
-        node.__static_props__ = static_props
-        node.__static_methods__ = static_methods
-        classes[node.name] = node
-        return None
+        elif isinstance(other, float):
+            try:
+                return float(val)
+            except Exception:
+                pass
+    return val
 
-    # new ClassName() instance creation
-    if isinstance(node, NewInstanceNode):
-        def collect_class_hierarchy(class_name):
-            hierarchy = []
-            current = classes.get(class_name)
-            while current:
-                hierarchy.append(current)
-                base = getattr(current, 'base', None)
-                if base:
-                    current = classes.get(base)
-                else:
-                    break
-            return hierarchy
 
-        class_def = classes.get(node.class_name)
-        if not class_def:
-            raise Exception(f"Class '{node.class_name}' not defined")
-        instance = {'__class__': node.class_name}
-        methods = {}
-        for cdef in reversed(collect_class_hierarchy(node.class_name)):
-            for stmt in cdef.body.statements:
-                if isinstance(stmt, VarDeclarationNode):
-                    if stmt.name not in instance:
-                        instance[stmt.name] = evaluate(stmt.value, memory)
-                elif isinstance(stmt, FunctionDefNode):
-                    methods[stmt.name] = stmt
-        instance['__methods__'] = methods
-        # Constructor çağrısı (init veya constructor methodu varsa)
-        ctor = methods.get('constructor') or methods.get('init')
-        if ctor:
-            local = {'this': instance}
+# Arithmetic and comparison operators; the logical ones are compiled to
+# short-circuit code and never reach binary_op
+_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '^': operator.pow,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def runtime_error(e, line='?', column='?'):
+    return Exception(f"[Line {line}, Column {column}] Runtime Error: {str(e)}")
+
+
+def binary_op(op, left, right, line='?', column='?'):
+    func = _OPERATORS.get(op)
+    if func is None:
+        if op in ('and', '&&'):
+            return bool(left) and bool(right)
+        elif op in ('or', '||'):
+            return bool(left) or bool(right)
+        raise runtime_error(f"Unknown operator: {op}", line, column)
+    # Sadece karşılaştırma ve aritmetik işlemlerde uygula
+    left_conv = auto_convert(left, right)
+    right_conv = auto_convert(right, left)
+    try:
+        # String birleştirme desteği
+        if op == '+' and (isinstance(left_conv, str) or isinstance(right_conv, str)):
+            return str(left_conv) + str(right_conv)
+        return func(left_conv, right_conv)
+    except Exception as e:
+        raise runtime_error(e, line, column)
+
+
+# Operator handler resolved once per node (or VM opcode): int/int and
+# float/float operands go straight to the operator, anything else takes
+# the auto_convert path in binary_op
+def binary_handler(op, line='?', column='?'):
+    func = _OPERATORS[op]
+
+    def handler(left, right):
+        kind = type(left)
+        if (kind is int or kind is float) and type(right) is kind:
             try:
-                evaluate(ctor.body, local)
-            except ReturnException as r:
-                pass
-        return instance
-    scope = local_scope if local_scope is not None else memory
-
-    # Array literal
-    if isinstance(node, ArrayNode):
-        return [evaluate(el, scope) for el in node.elements]
-
-    # Array index access
-    if isinstance(node, IndexAccessNode):
-        lst = evaluate(node.list_expr, scope)
-        idx = evaluate(node.index_expr, scope)
-        return lst[idx]
-
-    if isinstance(node, LiteralNode):
-        value = node.value
-        if value == 'null':
-            return None
-        elif value == 'True':
-            return True
-        elif value == 'False':
-            return False
-        return float(value) if '.' in value else int(value)
-
-    elif isinstance(node, StringNode):
-        return node.value
-    
-    elif isinstance(node, InputNode):
-        prompt = evaluate(node.prompt, scope)
-        return input(str(prompt))  # Ensure it's string prompt
-
-    elif isinstance(node, IdentifierNode):
-        name = node.name
-        if name in scope:
-            return scope[name]
-        elif name in memory:
-            return memory[name]
-        elif name in classes:
-            return classes[name]
+                return func(left, right)
+            except Exception as e:
+                raise runtime_error(e, line, column)
+        return binary_op(op, left, right, line, column)
+    return handler
+
+
+# String method call support: "abc".substring(1, 2), toUpperCase, toLowerCase, contains, replace
+def call_string_method(value, method, args):
+    if method == 'substring':
+        if len(args) == 1:
+            return value[args[0]:]
+        elif len(args) == 2:
+            return value[args[0]:args[1]]
         else:
-            # Satır ve sütun numarası varsa, kullanıcı dostu hata mesajı ver
-            line = getattr(node, 'line', '?')
-            column = getattr(node, 'column', '?')
-            raise Exception(f"[Line {line}, Column {column}] Name Error: Undefined variable or class '{name}'")
-
-    # Property/method/static access: p.x, p.foo, ClassName.staticX, ClassName.staticFoo, string method/property
-    elif isinstance(node, BinaryOpNode) and node.operator == '.':
-        left_val = evaluate(node.left, scope)
-        prop = node.right.name
-        # String property support
+            raise Exception('substring() expects 1 or 2 arguments')
+    elif method == 'toUpperCase':
+        if len(args) != 0:
+            raise Exception('toUpperCase() expects no arguments')
+        return value.upper()
+    elif method == 'toLowerCase':
+        if len(args) != 0:
+            raise Exception('toLowerCase() expects no arguments')
+        return value.lower()
+    elif method == 'contains':
+        if len(args) != 1:
+            raise Exception('contains() expects 1 argument')
+        return args[0] in value
+    elif method == 'replace':
+        if len(args) != 2:
+            raise Exception('replace() expects 2 arguments')
+        return value.replace(str(args[0]), str(args[1]))
+    else:
+        raise Exception(f"Unknown string method: {method}")
+
+
+# Built-in functions, used when no user function of that name exists. They
+# return lazy iterables: a for-each over a direct call consumes them without
+# a list (see compile_iterable), every other call gets an array.
+def builtin_range(*args):
+    if not 1 <= len(args) <= 3:
+        raise Exception('range() expects 1 to 3 arguments')
+    if any(type(arg) is not int for arg in args):
+        raise Exception('range() expects integer arguments')
+    if len(args) == 3 and args[2] == 0:
+        raise Exception('range() step must not be zero')
+    return range(*args)
+
+
+def _map_argument(name, args):
+    if len(args) != 1:
+        raise Exception(f'{name}() expects 1 argument')
+    value = args[0]
+    if not isinstance(value, dict) or '__class__' in value:
+        raise Exception(f'{name}() expects a map')
+    return value
+
+
+def builtin_keys(*args):
+    return _map_argument('keys', args).keys()
+
+
+def builtin_items(*args):
+    # Her eleman [anahtar, değer] dizisi olarak, tek tek üretilir
+    return map(list, _map_argument('items', args).items())
+
+
+BUILTINS = {
+    'range': builtin_range,
+    'keys': builtin_keys,
+    'items': builtin_items,
+}
+
+
+def call_builtin(name, args):
+    builtin = BUILTINS.get(name)
+    if builtin is None:
+        raise Exception(f"Function '{name}' not defined")
+    return list(builtin(*args))
+
+
+# ----------------------
+# Interpreter state
+# ----------------------
+
+# Runtime class object: what a class name evaluates to. The member list and
+# static members live here rather than on the (shareable) ClassDefNode.
+class Class:
+    def __init__(self, node, members):
+        self.node = node
+        self.name = node.name
+        self.base = node.base
+        self.members = members      # (kind, name, value | default closure | Function, is_private)
+        self.static_props = {}
+        self.static_methods = {}
+
+
+# Everything instantiate() needs, flattened over the class hierarchy once:
+# a template dict with the constant field defaults already filled in, the
+# fields whose defaults must run per instance (arrays, maps, expressions),
+# and the method table and private sets shared by every instance.
+class ClassDescriptor:
+    __slots__ = ('template', 'dynamic', 'methods', 'ctor')
+
+    def __init__(self, class_name, hierarchy):
+        template = {'__class__': class_name}
+        dynamic = []
+        methods = {}
+        # Inheritance: base class'lardan property ve methodları sırayla ekle (alt sınıf override eder)
+        for cls in reversed(hierarchy):
+            for kind, name, member, is_private in cls.members:
+                if kind == 'method':
+                    methods[name] = member
+                    if is_private:
+                        template.setdefault('__private_methods__', set()).add(name)
+                    continue
+                if name not in template:
+                    if kind == 'const':
+                        template[name] = member
+                    else:
+                        # Yer tutucu: anahtar sırası korunur, değer her instance'ta hesaplanır
+                        template[name] = None
+                        if member is not None:
+                            dynamic.append((name, member))
+                if is_private:
+                    template.setdefault('__private__', set()).add(name)
+        template['__methods__'] = methods
+        self.template = template
+        self.dynamic = dynamic
+        self.methods = methods
+        # Constructor (init veya constructor methodu varsa)
+        self.ctor = methods.get('constructor') or methods.get('init')
+
+
+# One program's state: globals, function and class tables, the receivers of
+# running method calls and the output sink. Interpreters share nothing, so a
+# process can keep several warm ones (one per thread) and reset() them
+# between scripts.
+class Interpreter:
+    def __init__(self, output=None, parallel='thread'):
+        self.output = output if output is not None else OutputSink()
+        self.parallel = parallel        # backend of 'parallel for': 'process', 'thread' or 'serial'
+        self.pool = None                # worker pool of 'parallel for', created on first use
+        self.in_parallel_worker = False # runs a chunk of a 'parallel for': input() is an error
+        self.reset()
+
+    def reset(self):
+        self.memory = {}                # global variables
+        self.functions = {}             # function definitions (name -> Function)
+        self.classes = {}               # class definitions (name -> Class)
+        self.class_descriptors = {}     # instantiation layouts (name -> ClassDescriptor), built on first use
+        self.active_receivers = {}      # receivers of the running method calls (id -> nesting depth)
+
+    # Shut down the worker pool of 'parallel for' loops, if one was started
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def compile(self, ast):
+        return [compile_node(node, None, self) for node in ast]
+
+    def run(self, ast):
+        program = self.compile(ast)
+        try:
+            for stmt in program:
+                stmt(self.memory)
+        finally:
+            self.output.flush()
+
+    def evaluate(self, node, local_scope=None):
+        scope = local_scope if local_scope is not None else self.memory
+        try:
+            return compile_node(node, None, self)(scope)
+        finally:
+            self.output.flush()
+
+    def lookup_name(self, name, scope, line='?', column='?'):
+        value = scope.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self.lookup_global(name, line, column)
+
+    def lookup_global(self, name, line='?', column='?'):
+        value = self.memory.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        if name in self.classes:
+            return self.classes[name]
+        # Satır ve sütun numarası varsa, kullanıcı dostu hata mesajı ver
+        raise Exception(f"[Line {line}, Column {column}] Name Error: Undefined variable or class '{name}'")
+
+    # Private üyelere sadece aynı nesnenin metodları içinden (this) erişilebilir:
+    # every method call registers its receiver here while it runs
+    def private_access_allowed(self, instance):
+        return id(instance) in self.active_receivers
+
+    # Property/method/static access: p.x, p.foo, ClassName.staticX, ClassName.staticFoo, string property
+    def get_member(self, left_val, prop, static_name=None):
         if isinstance(left_val, str):
             if prop == 'length':
                 return len(left_val)
             raise Exception(f"Unknown string property: {prop}")
         # Instance property/method
         if isinstance(left_val, dict):
-            # ...existing code...
             if '__private__' in left_val and prop in left_val['__private__']:
-                # ...existing code...
-                import inspect
-                stack = inspect.stack()
-                # ...existing code...
-                allow = False
-                for frame in stack:
-                    if 'this' in frame.frame.f_locals and frame.frame.f_locals['this'] is left_val:
-                        allow = True
-                        break
-                if not allow:
+                if not self.private_access_allowed(left_val):
                     raise Exception(f"Property '{prop}' is private")
             if prop in left_val:
                 return left_val[prop]
             elif '__methods__' in left_val and prop in left_val['__methods__']:
-                # ...existing code...
                 if '__private_methods__' in left_val and prop in left_val['__private_methods__']:
-                    import inspect
-                    stack = inspect.stack()
-                    allow = False
-                    for frame in stack:
-                        if 'this' in frame.frame.f_locals and frame.frame.f_locals['this'] is left_val:
-                            allow = True
-                            break
-                    if not allow:
+                    if not self.private_access_allowed(left_val):
                         raise Exception(f"Method '{prop}' is private")
                 return ('__method__', left_val, left_val['__methods__'][prop])
         # Static property/method: ClassName.x
-        elif isinstance(node.left, IdentifierNode) and node.left.name in classes:
-            class_def = classes[node.left.name]
-            # ...existing code...
-            if hasattr(class_def, '__static_props__') and prop in class_def.__static_props__:
-                return class_def.__static_props__[prop]
-            # ...existing code...
-            if hasattr(class_def, '__static_methods__') and prop in class_def.__static_methods__:
-                return ('__staticmethod__', class_def, class_def.__static_methods__[prop])
+        elif static_name is not None and static_name in self.classes:
+            cls = self.classes[static_name]
+            if prop in cls.static_props:
+                return cls.static_props[prop]
+            if prop in cls.static_methods:
+                return ('__staticmethod__', cls, cls.static_methods[prop])
         raise Exception(f"Property or method '{prop}' not found on object or class")
 
-    # String method call support: "abc".substring(1, 2), toUpperCase, toLowerCase, contains, replace
-    elif isinstance(node, FunctionCallNode) and isinstance(node.name, BinaryOpNode) and node.name.operator == '.':
-        left_val = evaluate(node.name.left, scope)
-        method = node.name.right.name
-        if isinstance(left_val, str):
-            args = [evaluate(arg, scope) for arg in node.args]
-            if method == 'substring':
-                if len(args) == 1:
-                    return left_val[args[0]:]
-                elif len(args) == 2:
-                    return left_val[args[0]:args[1]]
-                else:
-                    raise Exception('substring() expects 1 or 2 arguments')
-            elif method == 'toUpperCase':
-                if len(args) != 0:
-                    raise Exception('toUpperCase() expects no arguments')
-                return left_val.upper()
-            elif method == 'toLowerCase':
-                if len(args) != 0:
-                    raise Exception('toLowerCase() expects no arguments')
-                return left_val.lower()
-            elif method == 'contains':
-                if len(args) != 1:
-                    raise Exception('contains() expects 1 argument')
-                return args[0] in left_val
-            elif method == 'replace':
-                if len(args) != 2:
-                    raise Exception('replace() expects 2 arguments')
-                return left_val.replace(str(args[0]), str(args[1]))
+    def push_receiver(self, instance):
+        key = id(instance)
+        self.active_receivers[key] = self.active_receivers.get(key, 0) + 1
+        return key
+
+    def pop_receiver(self, key):
+        depth = self.active_receivers[key] - 1
+        if depth:
+            self.active_receivers[key] = depth
+        else:
+            del self.active_receivers[key]
+
+    def call_method(self, func, args, this):
+        key = self.push_receiver(this)
+        try:
+            return call_function(func, args, this)
+        finally:
+            self.pop_receiver(key)
+
+    # Hit/miss counters of every memoized function (name -> MemoCache.info())
+    def memo_stats(self):
+        return {name: func.memo.info() for name, func in self.functions.items() if func.memo is not None}
+
+    def define_class(self, cls):
+        self.classes[cls.name] = cls
+        # Bir sınıf (yeniden) tanımlanınca alt sınıfların layout'u da değişebilir
+        self.class_descriptors.clear()
+
+    def collect_class_hierarchy(self, class_name):
+        # Inheritance desteği: üst sınıfları sırayla topla
+        hierarchy = []
+        current = self.classes.get(class_name)
+        while current:
+            hierarchy.append(current)
+            if current.base:
+                current = self.classes.get(current.base)
             else:
-                raise Exception(f"Unknown string method: {method}")
-        # Instance property/method
-        if isinstance(left_val, dict):
-            # Access control: private property/method dışarıdan erişilemez
-            if '__private__' in left_val and prop in left_val['__private__']:
-                # Sadece this içinden erişime izin ver
-                import inspect
-                stack = inspect.stack()
-                # this ile erişim: en az bir üstte local'de 'this' varsa izin ver
-                allow = False
-                for frame in stack:
-                    if 'this' in frame.frame.f_locals and frame.frame.f_locals['this'] is left_val:
-                        allow = True
-                        break
-                if not allow:
-                    raise Exception(f"Property '{prop}' is private")
-            if prop in left_val:
-                return left_val[prop]
-            elif '__methods__' in left_val and prop in left_val['__methods__']:
-                # Private method kontrolü
-                if '__private_methods__' in left_val and prop in left_val['__private_methods__']:
-                    import inspect
-                    stack = inspect.stack()
-                    allow = False
-                    for frame in stack:
-                        if 'this' in frame.frame.f_locals and frame.frame.f_locals['this'] is left_val:
-                            allow = True
-                            break
-                    if not allow:
-                        raise Exception(f"Method '{prop}' is private")
-                return ('__method__', left_val, left_val['__methods__'][prop])
-        # Static property/method: ClassName.x
-        elif isinstance(node.left, IdentifierNode) and node.left.name in classes:
-            class_def = classes[node.left.name]
-            # Static property
-            if hasattr(class_def, '__static_props__') and prop in class_def.__static_props__:
-                return class_def.__static_props__[prop]
-            # Static method
-            if hasattr(class_def, '__static_methods__') and prop in class_def.__static_methods__:
-                return ('__staticmethod__', class_def, class_def.__static_methods__[prop])
-        raise Exception(f"Property or method '{prop}' not found on object or class")
+                break
+        return hierarchy
+
+    def class_descriptor(self, class_name):
+        descriptor = self.class_descriptors.get(class_name)
+        if descriptor is None:
+            if class_name not in self.classes:
+                raise Exception(f"Class '{class_name}' not defined")
+            descriptor = ClassDescriptor(class_name, self.collect_class_hierarchy(class_name))
+            self.class_descriptors[class_name] = descriptor
+        return descriptor
+
+    def instantiate(self, class_name, args=()):
+        descriptor = self.class_descriptor(class_name)
+        instance = descriptor.template.copy()
+        for name, default in descriptor.dynamic:
+            instance[name] = default(self.memory)
+        ctor = descriptor.ctor
+        if ctor:
+            key = self.push_receiver(instance)
+            try:
+                ctor.body(ctor.make_frame(list(args), instance))
+            finally:
+                self.pop_receiver(key)
+        return instance
+
+
+# ----------------------
+# Parallel for-each
+# ----------------------
+# 'parallel for (x in items) { ... }' splits items into one contiguous chunk
+# per worker. Each chunk runs on a fresh Interpreter rebuilt from a snapshot:
+# the function and class definitions (as AST nodes), plus the globals they
+# and the body mention, the enclosing function's locals and the static
+# properties, pickled once with Functions and Classes replaced by their
+# names. Arrays, maps and objects among the items are pickled one by one,
+# so every iteration gets its own copy of its item.
+#
+# Every iteration therefore sees the state from before the loop plus its
+# own changes, whatever the backend and the number of workers. The only
+# changes kept are writes to name[x] (x the loop variable, name an outer
+# array or map used nowhere else in the loop) and changes to the items;
+# the parent applies them, with the print output, in element order.
+# Anything else the body changes outside itself fails the loop, as do two
+# iterations changing the same part of a shared item.
+#
+# The body may not assign variables it did not declare (or define
+# functions/classes, return, or read input): names it declares are local to
+# each iteration. Functions it calls cannot read input either; worker
+# interpreters raise from input().
+
+PARALLEL_BACKENDS = ('process', 'thread', 'serial')
+_PARALLEL_FORBIDDEN = {FunctionDefNode: 'define functions', ClassDefNode: 'define classes',
+                       ReturnNode: 'return', InputNode: 'read input'}
+
+
+def _position(node):
+    line = node.line if getattr(node, 'line', None) is not None else '?'
+    column = node.column if getattr(node, 'column', None) is not None else '?'
+    return f"[Line {line}, Column {column}]"
+
+
+# The variable an assignment target writes into: a in a[i].b = ...
+def target_root(target):
+    while True:
+        if isinstance(target, IndexAccessNode):
+            target = target.list_expr
+        elif isinstance(target, BinaryOpNode) and target.operator == '.':
+            target = target.left
+        else:
+            return target
+
+
+def is_slot_access(node, var_name):
+    return (isinstance(node, IndexAccessNode) and isinstance(node.list_expr, IdentifierNode)
+            and isinstance(node.index_expr, IdentifierNode) and node.index_expr.name == var_name)
+
+
+# Returns the names local to each iteration and the outer names written as name[x]
+def check_parallel_body(node):
+    var_name = node.var_name
+    local_names = set(assigned_names(node.body)) | {var_name}
+    declared = {var_name}
+    assignments = []
+    identifiers = []
+    slot_accesses = []
+    rebinds_var = False
+    stack = [node.body]
+    while stack:
+        current = stack.pop()
+        if type(current) in _PARALLEL_FORBIDDEN:
+            raise Exception(f"Parallel for-each over '{var_name}': the body cannot {_PARALLEL_FORBIDDEN[type(current)]}")
+        if isinstance(current, VarDeclarationNode):
+            declared.add(current.name)
+            rebinds_var |= current.name == var_name
+        elif isinstance(current, ForEachNode):
+            declared.add(current.var_name)
+            rebinds_var |= current.var_name == var_name
+        elif isinstance(current, TryCatchNode) and current.catch_var:
+            declared.add(current.catch_var)
+            rebinds_var |= current.catch_var == var_name
+        elif isinstance(current, BinaryOpNode) and current.operator == '=':
+            assignments.append(current.left)
+        elif isinstance(current, IdentifierNode):
+            identifiers.append(current)
+        if is_slot_access(current, var_name):
+            slot_accesses.append(current)
+        stack.extend(iter_child_nodes(current))
+    slot_names = set()
+    for target in assignments:
+        if isinstance(target, IdentifierNode):
+            if target.name not in declared:
+                raise Exception(f"{_position(target)} Parallel for-each body cannot assign outer variable '{target.name}'")
+            rebinds_var |= target.name == var_name
+            continue
+        root = target_root(target)
+        if isinstance(root, IdentifierNode) and root.name in declared:
+            continue
+        if not is_slot_access(target, var_name):
+            raise Exception(f"{_position(root)} Parallel for-each body can only change outer arrays and maps "
+                            f"as name[{var_name}] = ...")
+        slot_names.add(target.list_expr.name)
+    if slot_names and rebinds_var:
+        raise Exception(f"Parallel for-each body writes {min(slot_names)}[{var_name}] and cannot assign '{var_name}'")
+    # Reading other elements would see the writes of some iterations only
+    allowed = {id(access.list_expr) for access in slot_accesses}
+    for identifier in identifiers:
+        if identifier.name in slot_names and id(identifier) not in allowed:
+            raise Exception(f"{_position(identifier)} Parallel for-each body writes {identifier.name}[{var_name}] "
+                            f"and cannot use '{identifier.name}' in any other way")
+    return local_names, slot_names
+
+
+def referenced_names(nodes):
+    names = set()
+    stack = list(nodes)
+    while stack:
+        current = stack.pop()
+        if isinstance(current, IdentifierNode):
+            names.add(current.name)
+        stack.extend(iter_child_nodes(current))
+    return names
+
+
+# Globals a function or class definition can read: identifiers that are not
+# parameters or locals (FrameLayout slots) of the function they appear in.
+# Field defaults of a class are evaluated in the global scope.
+def global_names(node, has_this=False):
+    slots = FrameLayout(node.params, node.body, has_this).slots if isinstance(node, FunctionDefNode) else {}
+    is_class = isinstance(node, ClassDefNode)
+    names = set()
+    stack = list(iter_child_nodes(node))
+    while stack:
+        current = stack.pop()
+        if isinstance(current, (FunctionDefNode, ClassDefNode)):
+            names |= global_names(current, is_class)
+            continue
+        if isinstance(current, IdentifierNode) and current.name not in slots:
+            names.add(current.name)
+        stack.extend(iter_child_nodes(current))
+    return names
+
+
+# The pool stays open between loops; Interpreter.close() shuts it down
+def parallel_pool(interp):
+    if interp.pool is None:
+        executor = ProcessPoolExecutor if interp.parallel == 'process' else ThreadPoolExecutor
+        interp.pool = executor(max_workers=os.cpu_count() or 1)
+    return interp.pool
+
+
+# Functions and classes travel by name: (object, key) pairs for one interpreter
+def runtime_objects(interp):
+    pairs = []
+    for name, func in interp.functions.items():
+        pairs.append((func, ('function', name)))
+    for name, cls in interp.classes.items():
+        pairs.append((cls, ('class', name)))
+        for kind, member_name, member, _ in cls.members:
+            if kind == 'method':
+                pairs.append((member, ('method', name, member_name)))
+    return pairs
+
+
+class _SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, interp):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.keys = {id(obj): key for obj, key in runtime_objects(interp)}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (Function, Class)):
+            key = self.keys.get(id(obj))
+            if key is None:
+                raise Exception(f"Parallel for-each: '{obj.name}' is not a defined function or class and cannot be sent to a worker")
+            return key
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, interp):
+        super().__init__(file)
+        self.objects = {key: obj for obj, key in runtime_objects(interp)}
+
+    def persistent_load(self, key):
+        return self.objects[key]
+
+
+def dump_snapshot(value, interp):
+    buffer = io.BytesIO()
+    _SnapshotPickler(buffer, interp).dump(value)
+    return buffer.getvalue()
+
+
+def load_snapshot(data, interp):
+    return _SnapshotUnpickler(io.BytesIO(data), interp).load()
 
-    elif isinstance(node, BinaryOpNode):
-        # Satır ve sütun numarası yakala (varsa)
-        line = getattr(node, 'line', '?')
-        column = getattr(node, 'column', '?')
-        op = node.operator
-        # Assignment as expression: x = expr, or array index assignment
-        if op == '=':
-            # Array index assignment: l[1] = 99;
-            if isinstance(node.left, IndexAccessNode):
-                lst = evaluate(node.left.list_expr, scope)
-                idx = evaluate(node.left.index_expr, scope)
-                value = evaluate(node.right, scope)
-                lst[idx] = value
-                return value
-            # Property assignment: p.x = ... veya ClassName.staticX = ...
-            if isinstance(node.left, BinaryOpNode) and node.left.operator == '.':
-                obj = evaluate(node.left.left, scope)
-                prop = node.left.right.name
-                value = evaluate(node.right, scope)
-                # Instance property
-                if isinstance(obj, dict):
-                    obj[prop] = value
-                    return value
-                # Static property assignment: ClassName.x = ...
-                elif hasattr(obj, '__static_props__'):
-                    obj.__static_props__[prop] = value
-                    return value
-                else:
-                    raise Exception('Left side of assignment must be a variable, array index, or object property')
-            # Normal variable assignment
-            if not isinstance(node.left, IdentifierNode):
-                raise Exception('Left side of assignment must be a variable, array index, or object property')
-            value = evaluate(node.right, scope)
-            scope[node.left.name] = value
-            return value
 
-        left = evaluate(node.left, scope)
-        right = evaluate(node.right, scope)
-
-        # --- Otomatik tip dönüşümü: Karşılaştırmalarda input'tan gelen string sayısal ise dönüştür ---
-        def auto_convert(val, other):
-            # Eğer val string ve other int/float ise, val'ı dönüştür
-            if isinstance(val, str):
-                if isinstance(other, int):
-                    try:
-                        return int(val)
-                    except Exception:
-                        pass
-                elif isinstance(other, float):
-                    try:
-                        return float(val)
-                    except Exception:
-                        pass
-            return val
-
-        # Sadece karşılaştırma ve aritmetik işlemlerde uygula
-        if op in ('==', '!=', '<', '<=', '>', '>=', '+', '-', '*', '/', '^'):
-            # Her iki tarafı da uygun şekilde dönüştür
-            left_conv = auto_convert(left, right)
-            right_conv = auto_convert(right, left)
+# Patch turning before into after: None (unchanged), ('set', value), or an
+# in-place ('list', [(index, patch)]) / ('dict', [(key, patch)], removed keys)
+def diff_values(before, after, seen):
+    if type(before) is not type(after):
+        return ('set', after)
+    if not isinstance(after, (list, dict)):
+        return None if before == after else ('set', after)
+    if id(after) in seen:
+        return None
+    seen.add(id(after))
+    if isinstance(after, list):
+        if len(before) != len(after):
+            return ('set', after)
+        changes = [(i, patch) for i, patch in
+                   ((i, diff_values(old, new, seen)) for i, (old, new) in enumerate(zip(before, after))) if patch]
+        return ('list', changes) if changes else None
+    changes = []
+    for key, new in after.items():
+        if key not in before:
+            changes.append((key, ('set', new)))
+        else:
+            patch = diff_values(before[key], new, seen)
+            if patch:
+                changes.append((key, patch))
+    removed = [key for key in before if key not in after]
+    return ('dict', changes, removed) if changes or removed else None
+
+
+def apply_patch(target, patch):
+    for key, change in patch[1]:
+        if change[0] == 'set':
+            target[key] = change[1]
         else:
-            left_conv = left
-            right_conv = right
+            apply_patch(target[key], change)
+    if patch[0] == 'dict':
+        for key in patch[2]:
+            target.pop(key, None)
+
 
+# (container id, key) of every value patch replaces or removes in target
+def patched_slots(target, patch):
+    for key, change in patch[1]:
+        if change[0] == 'set':
+            yield id(target), key
+        else:
+            yield from patched_slots(target[key], change)
+    if patch[0] == 'dict':
+        for key in patch[2]:
+            yield id(target), key
+
+
+# Patch of the outer state ([globals, locals, statics]) one chunk changed.
+# The name[x] targets are compared first, so values they share with other
+# names count as theirs; anything else changed, or a key that is not one of
+# the chunk's items, is an error.
+def parallel_changes(before, after, slot_names, values):
+    seen = set()
+    changes = []
+    for index, names in enumerate(slot_names):
+        scope_changes = []
+        for name in sorted(names):
+            if name not in after[index]:
+                continue
+            change = diff_values(before[index].get(name), after[index][name], seen)
+            if change is None:
+                continue
+            if change[0] == 'set' or change[0] == 'dict' and change[2] or any(key not in values for key, _ in change[1]):
+                raise Exception(f"Parallel for-each body changed {name}[...] at a key other than the loop variable")
+            scope_changes.append((name, change))
+        if scope_changes:
+            changes.append((index, ('dict', scope_changes, [])))
+    other = diff_values(before, after, seen)
+    if other:
+        index, change = other[1][0]
+        name = change[1][0][0]
+        if index == 2:
+            raise Exception(f"Parallel for-each body changed static properties of class '{name}'")
+        raise Exception(f"Parallel for-each body changed outer value '{name}'; only the loop items "
+                        f"and name[x] = ... writes are kept")
+    return ('list', changes) if changes else None
+
+
+def run_parallel_for_each(interp, node, local_names, slot_names, body_names, items, outer):
+    if not items:
+        return
+    var_name = node.var_name
+    functions = [func.node for func in interp.functions.values()]
+    classes = [cls.node for cls in interp.classes.values()]
+    statics = {name: cls.static_props for name, cls in interp.classes.items()}
+    definition_names = set().union(*map(global_names, functions + classes))
+    # name[x] targets are the enclosing function's locals if it has one by that name
+    outer_slots = slot_names & outer.keys() if outer is not None else set()
+    global_slots = slot_names - outer_slots
+    shared_slots = global_slots & definition_names
+    if shared_slots:
+        name = min(shared_slots)
+        raise Exception(f"Parallel for-each body writes {name}[{var_name}], so functions and classes cannot use '{name}'")
+    if slot_names:
         try:
-            if op == '+':
-                # String birleştirme desteği
-                if isinstance(left_conv, str) or isinstance(right_conv, str):
-                    return str(left_conv) + str(right_conv)
-                return left_conv + right_conv
-            elif op == '-':
-                return left_conv - right_conv
-            elif op == '*':
-                return left_conv * right_conv
-            elif op == '/':
-                return left_conv / right_conv
-            elif op == '^':
-                return left_conv ** right_conv
-            elif op == '==':
-                return left_conv == right_conv
-            elif op == '!=':
-                return left_conv != right_conv
-            elif op == '<':
-                return left_conv < right_conv
-            elif op == '<=':
-                return left_conv <= right_conv
-            elif op == '>':
-                return left_conv > right_conv
-            elif op == '>=':
-                return left_conv >= right_conv
-            elif op in ('and', '&&'):
-                return bool(left) and bool(right)
-            elif op in ('or', '||'):
-                return bool(left) or bool(right)
-            else:
-                raise Exception(f"Unknown operator: {op}")
+            distinct = len(set(items)) == len(items)
+        except TypeError:
+            distinct = False
+        if not distinct:
+            raise Exception(f"Parallel for-each body writes {min(slot_names)}[{var_name}], "
+                            f"so the values of '{var_name}' must be distinct numbers or strings")
+    names = body_names | definition_names
+    memory = {name: value for name, value in interp.memory.items() if name in names}
+    shared = dump_snapshot([memory, outer, statics], interp)
+    mutable = any(isinstance(item, (list, dict)) for item in items)
+
+    workers = 1 if interp.parallel == 'serial' else min(os.cpu_count() or 1, len(items))
+    size, extra = divmod(len(items), workers)
+    bounds = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (i < extra)
+        bounds.append((start, end))
+        start = end
+    tasks = []
+    for start, end in bounds:
+        if mutable:
+            chunk = [dump_snapshot(item, interp) for item in items[start:end]]
+        else:
+            chunk = dump_snapshot(items[start:end], interp)
+        tasks.append((functions, classes, node, local_names, (global_slots, outer_slots, set()), shared, chunk, mutable))
+    if workers == 1:
+        results = list(map(_run_parallel_chunk, tasks))
+    else:
+        results = list(parallel_pool(interp).map(_run_parallel_chunk, tasks))
+    # Yasak bir değişiklik döngüyü hiçbir etki bırakmadan durdurur
+    for text, patch, item_patches, error in results:
+        if text is None:
+            raise error
+    item_changes = []
+    owners = {}
+    for (start, end), (text, patch, item_patches, error) in zip(bounds, results):
+        for index, item_patch in load_snapshot(item_patches, interp) if item_patches else ():
+            index += start
+            for slot in patched_slots(items[index], item_patch):
+                owner = owners.setdefault(slot, index)
+                if owner != index:
+                    raise Exception(f"Parallel for-each: iterations {owner + 1} and {index + 1} changed the same value "
+                                    f"of a shared array, map or object")
+            item_changes.append((index, item_patch))
+    # Sonuçlar eleman sırasıyla uygulanır: çıktı ve değişiklikler deterministik
+    changes = iter(item_changes)
+    change = next(changes, None)
+    for (start, end), (text, patch, item_patches, error) in zip(bounds, results):
+        interp.output.write(text)
+        if patch is not None:
+            apply_patch([interp.memory, outer, statics], load_snapshot(patch, interp))
+        while change is not None and change[0] < end:
+            apply_patch(items[change[0]], change[1])
+            change = next(changes, None)
+        if error is not None:
+            raise error
+
+
+def _run_parallel_chunk(task):
+    functions, classes, node, local_names, slot_names, shared, chunk, mutable = task
+    worker = Interpreter(OutputSink(io.StringIO()), parallel='serial')
+    worker.in_parallel_worker = True
+    for function_node in functions:
+        func = compile_function(function_node, worker)
+        worker.functions[func.name] = func
+    for class_node in classes:
+        members, statics = class_members(class_node, worker)
+        cls = Class(class_node, members)
+        for kind, name, member, _ in statics:
+            if kind == 'method':
+                cls.static_methods[name] = member
+        worker.classes[cls.name] = cls
+    before = load_snapshot(shared, worker)
+    state = load_snapshot(shared, worker)
+    memory, outer, statics = state
+    worker.memory.update(memory)
+    state[0] = worker.memory
+    for name, static_props in statics.items():
+        worker.classes[name].static_props = static_props
+    if mutable:
+        originals = [load_snapshot(item, worker) for item in chunk]
+        items = [load_snapshot(item, worker) for item in chunk]
+    else:
+        items = load_snapshot(chunk, worker)
+    scope = worker.memory if outer is None else outer
+    receiver = worker.push_receiver(outer['this']) if outer is not None and 'this' in outer else None
+
+    body = compile_node(node.body, None, worker)
+    store = _compile_store(node.var_name, None)
+    error = None
+    done = 0
+    try:
+        for item in items:
+            done += 1
+            store(scope, item)
+            body(scope)
+    except Exception as e:
+        # Hatadan önceki iterasyonların çıktısı ve değişiklikleri yine de uygulanır
+        error = e
+    if receiver is not None:
+        worker.pop_receiver(receiver)
+    # Döngü değişkeni ve gövdede tanımlanan isimler iterasyona özeldir
+    for name in local_names:
+        previous = before[1] if outer is not None else before[0]
+        if name in previous:
+            scope[name] = previous[name]
+        else:
+            scope.pop(name, None)
+    worker.output.flush()
+    try:
+        patch = parallel_changes(before, state, slot_names, set(items) if slot_names[0] or slot_names[1] else ())
+    except Exception as e:
+        return None, None, None, e
+    item_patches = []
+    if mutable:
+        for index in range(done):
+            item_patch = diff_values(originals[index], items[index], set())
+            if item_patch:
+                item_patches.append((index, item_patch))
+    return (worker.output.stream.getvalue(), dump_snapshot(patch, worker) if patch else None,
+            dump_snapshot(item_patches, worker) if item_patches else None, error)
+
+
+# ----------------------
+# Node compilers
+# ----------------------
+# Each compiler takes the node, the FrameLayout of the enclosing function
+# (None at top level, where closures receive a dict scope) and the
+# Interpreter whose state the closures use.
+
+def _compile_map(node, layout, interp):
+    pairs = [(k, compile_node(v, layout, interp)) for k, v in node.pairs]
+
+    def map_literal(scope):
+        return {k: v(scope) for k, v in pairs}
+    return map_literal
+
+
+def _compile_index(node, layout, interp):
+    container = compile_node(node.list_expr, layout, interp)
+    index = compile_node(node.index_expr, layout, interp)
+
+    def index_access(scope):
+        return container(scope)[index(scope)]
+    return index_access
+
+
+def _compile_try_catch(node, layout, interp):
+    try_block = compile_node(node.try_block, layout, interp)
+    catch_block = compile_node(node.catch_block, layout, interp)
+    catch_var = node.catch_var
+
+    if layout is not None and catch_var:
+        slot = layout.slots[catch_var]
+
+        def try_catch_frame(frame):
+            try:
+                return try_block(frame)
+            except Exception as e:
+                # Catch bloğu frame'in bir kopyasında çalışır
+                catch_frame = list(frame)
+                catch_frame[slot] = str(e)
+                return catch_block(catch_frame)
+        return try_catch_frame
+
+    def try_catch(scope):
+        try:
+            return try_block(scope)
         except Exception as e:
-            raise Exception(f"[Line {line}, Column {column}] Runtime Error: {str(e)}")
+            if catch_var:
+                # Yeni bir scope ile hata değişkenini ata
+                catch_scope = dict(scope) if scope is not interp.memory else {}
+                catch_scope[catch_var] = str(e)
+                return catch_block(catch_scope)
+            return catch_block(scope)
+    return try_catch
+
+
+def _compile_class_instance(node, layout, interp):
+    class_name = node.class_name
+    instantiate = interp.instantiate
+
+    def class_instance(scope):
+        return instantiate(class_name)
+    return class_instance
+
+
+def _compile_new_instance(node, layout, interp):
+    class_name = node.class_name
+    args = [compile_node(arg, layout, interp) for arg in node.args]
+    instantiate = interp.instantiate
+
+    def new_instance(scope):
+        return instantiate(class_name, [arg(scope) for arg in args])
+    return new_instance
+
 
-    elif isinstance(node, VarDeclarationNode):
-        if node.value is not None:
-            value = evaluate(node.value, scope)
+# Member list of a class body: (kind, name, value | default closure | Function, is_private),
+# plus the static subset
+def class_members(node, interp):
+    members = []
+    statics = []
+    for stmt in node.body.statements:
+        is_private = getattr(stmt, 'is_private', False)
+        if isinstance(stmt, VarDeclarationNode):
+            if isinstance(stmt.value, (LiteralNode, StringNode)):
+                # Immutable default: instance template'ine bir kez yazılır
+                members.append(('const', stmt.name, stmt.value.value, is_private))
+            else:
+                # Property default değerleri global scope'ta hesaplanır
+                default = compile_node(stmt.value, None, interp) if stmt.value is not None else None
+                members.append(('field', stmt.name, default, is_private))
+        elif isinstance(stmt, FunctionDefNode):
+            members.append(('method', stmt.name, compile_function(stmt, interp, has_this=True), is_private))
+        else:
+            continue
+        if getattr(stmt, 'is_static', False):
+            statics.append(members[-1])
+    return members, statics
+
+
+def _compile_class_def(node, layout, interp):
+    members, statics = class_members(node, interp)
+
+    def class_def(scope):
+        cls = Class(node, members)
+        # Static property/method desteği: class objesine ekle
+        for kind, name, member, _ in statics:
+            if kind == 'const':
+                cls.static_props[name] = member
+            elif kind == 'field':
+                cls.static_props[name] = member(interp.memory) if member is not None else None
+            else:
+                cls.static_methods[name] = member
+        interp.define_class(cls)
+        return None
+    return class_def
+
+
+def _compile_array(node, layout, interp):
+    elements = [compile_node(el, layout, interp) for el in node.elements]
+
+    def array_literal(scope):
+        return [el(scope) for el in elements]
+    return array_literal
+
+
+def _compile_literal(node, layout, interp):
+    value = node.value  # already decoded by parse_factor
+
+    def literal(scope):
+        return value
+    return literal
+
+
+def _compile_string(node, layout, interp):
+    value = node.value
+
+    def string(scope):
+        return value
+    return string
+
+
+def _compile_input(node, layout, interp):
+    prompt = compile_node(node.prompt, layout, interp)
+    output = interp.output
+
+    def input_expr(scope):
+        # Fonksiyonlar üzerinden de olsa worker'lar stdin okuyamaz
+        if interp.in_parallel_worker:
+            raise Exception("Parallel for-each: the body cannot read input")
+        text = str(prompt(scope))  # Ensure it's string prompt
+        # Bekleyen çıktı prompt'tan önce görünmeli
+        output.flush()
+        return input(text)
+    return input_expr
+
+
+def _compile_identifier(node, layout, interp):
+    name = node.name
+    line = getattr(node, 'line', '?')
+    column = getattr(node, 'column', '?')
+    lookup_global = interp.lookup_global
+
+    if layout is None:
+        def identifier(scope):
+            value = scope.get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+            return lookup_global(name, line, column)
+        return identifier
+
+    if name not in layout.slots:
+        def global_identifier(frame):
+            return lookup_global(name, line, column)
+        return global_identifier
+
+    slot = layout.slots[name]
+    if name in layout.definite:
+        def param_identifier(frame):
+            return frame[slot]
+        return param_identifier
+
+    def local_identifier(frame):
+        value = frame[slot]
+        if value is not _MISSING:
+            return value
+        # Henüz atanmamış local: global'e düş
+        return lookup_global(name, line, column)
+    return local_identifier
+
+
+def _compile_store(name, layout):
+    # Returns store(scope, value) for a plain variable
+    if layout is None:
+        def store_name(scope, value):
+            scope[name] = value
+        return store_name
+    slot = layout.slots[name]
+
+    def store_slot(frame, value):
+        frame[slot] = value
+    return store_slot
+
+
+def _compile_assignment(node, layout, interp):
+    value_fn = compile_node(node.right, layout, interp)
+    target = node.left
+    # Array index assignment: l[1] = 99;
+    if isinstance(target, IndexAccessNode):
+        container = compile_node(target.list_expr, layout, interp)
+        index = compile_node(target.index_expr, layout, interp)
+
+        def assign_index(scope):
+            lst = container(scope)
+            idx = index(scope)
+            value = value_fn(scope)
+            lst[idx] = value
+            return value
+        return assign_index
+    # Property assignment: p.x = ... veya ClassName.staticX = ...
+    if isinstance(target, BinaryOpNode) and target.operator == '.':
+        obj_fn = compile_node(target.left, layout, interp)
+        prop = target.right.name
+
+        def assign_property(scope):
+            obj = obj_fn(scope)
+            value = value_fn(scope)
+            # Instance property
+            if isinstance(obj, dict):
+                obj[prop] = value
+                return value
+            # Static property assignment: ClassName.x = ...
+            elif isinstance(obj, Class):
+                obj.static_props[prop] = value
+                return value
+            raise Exception('Left side of assignment must be a variable, array index, or object property')
+        return assign_property
+    # Normal variable assignment
+    if not isinstance(target, IdentifierNode):
+        def invalid_assignment(scope):
+            raise Exception('Left side of assignment must be a variable, array index, or object property')
+        return invalid_assignment
+
+    if layout is None:
+        name = target.name
+
+        def assign(scope):
+            value = value_fn(scope)
+            scope[name] = value
+            return value
+        return assign
+
+    slot = layout.slots[target.name]
+
+    def assign_slot(frame):
+        value = value_fn(frame)
+        frame[slot] = value
+        return value
+    return assign_slot
+
+
+# Inline caches: member reads and method calls remember, per call site, what
+# the lookup found for the classes seen there. An instance's class is
+# identified by its '__methods__' dict, which every instance of a class
+# shares and which is rebuilt when classes are redefined. The last class
+# seen is checked first; sites that see more than INLINE_CACHE_SIZE classes
+# keep using the generic lookup for the others.
+INLINE_CACHE_SIZE = 4
+
+
+def _compile_member(node, layout, interp):
+    left = compile_node(node.left, layout, interp)
+    prop = node.right.name
+    static_name = node.left.name if isinstance(node.left, IdentifierNode) else None
+    get_member = interp.get_member
+    private_access_allowed = interp.private_access_allowed
+    last_methods = _MISSING     # class of the last instance read here
+    last_private = False        # whether prop is a private field of that class
+
+    def member(scope):
+        nonlocal last_methods, last_private
+        left_val = left(scope)
+        if type(left_val) is dict:
+            value = left_val.get(prop, _MISSING)
+            if value is not _MISSING:
+                methods = left_val.get('__methods__')
+                if methods is not last_methods:
+                    last_methods = methods
+                    last_private = prop in left_val.get('__private__', ())
+                if not last_private or private_access_allowed(left_val):
+                    return value
+        return get_member(left_val, prop, static_name)
+    return member
+
+
+def _compile_binary(node, layout, interp):
+    op = node.operator
+    if op == '=':
+        return _compile_assignment(node, layout, interp)
+    if op == '.':
+        return _compile_member(node, layout, interp)
+    left = compile_node(node.left, layout, interp)
+    right = compile_node(node.right, layout, interp)
+    # Mantıksal operatörler kısa devre: sağ taraf gerekmedikçe hesaplanmaz
+    if op in ('and', '&&'):
+        def logical_and(scope):
+            return bool(left(scope)) and bool(right(scope))
+        return logical_and
+    if op in ('or', '||'):
+        def logical_or(scope):
+            return bool(left(scope)) or bool(right(scope))
+        return logical_or
+    # Satır ve sütun numarası yakala (varsa)
+    line = getattr(node, 'line', '?')
+    column = getattr(node, 'column', '?')
+
+    handler = binary_handler(op, line, column)
+
+    def binary(scope):
+        return handler(left(scope), right(scope))
+    return binary
+
+
+def _compile_var_declaration(node, layout, interp):
+    value_fn = compile_node(node.value, layout, interp) if node.value is not None else None
+    store = _compile_store(node.name, layout)
+    var_type = node.var_type
+
+    def var_declaration(scope):
+        if value_fn is not None:
+            value = value_fn(scope)
             # Otomatik tip dönüşümü: int x = input(); gibi durumlar için
-            if hasattr(node, 'var_type'):
-                # input fonksiyonu sonucu ise ve tip int/float ise dönüştür
-                if node.var_type == 'int' and isinstance(value, str):
-                    try:
-                        value = int(value)
-                    except Exception:
-                        raise Exception(f"Cannot convert input to int: {value}")
-                elif node.var_type == 'float' and isinstance(value, str):
-                    try:
-                        value = float(value)
-                    except Exception:
-                        raise Exception(f"Cannot convert input to float: {value}")
+            if var_type == 'int' and isinstance(value, str):
+                try:
+                    value = int(value)
+                except Exception:
+                    raise Exception(f"Cannot convert input to int: {value}")
+            elif var_type == 'float' and isinstance(value, str):
+                try:
+                    value = float(value)
+                except Exception:
+                    raise Exception(f"Cannot convert input to float: {value}")
         else:
             value = None
-        scope[node.name] = value
+        store(scope, value)
+    return var_declaration
+
+
+def _compile_print(node, layout, interp):
+    value_fn = compile_node(node.value, layout, interp)
+    output = interp.output
 
-    elif isinstance(node, PrintNode):
-        value = evaluate(node.value, scope)
+    def print_stmt(scope):
+        value = value_fn(scope)
         if value is None:
-            print('null')
+            output.write('null\n')
         else:
-            print(value)
-
-    elif isinstance(node, InputNode):
-        prompt = evaluate(node.prompt, scope)
-        return input(prompt)
-
-    elif isinstance(node, IfNode):
-        condition = evaluate(node.condition, scope)
-        if condition:
-            evaluate(node.then_block, scope)
-        elif node.else_block:
-            evaluate(node.else_block, scope)
-    
-    elif isinstance(node, ForNode):
-        # For döngüsünde ana scope'u kullan, böylece x gibi dış değişkenler güncellenir
-        evaluate(node.init, scope)
-        while evaluate(node.condition, scope):
-            evaluate(node.body, scope)
-            evaluate(node.increment, scope)
-    
-    # For-each döngüsü
-    elif isinstance(node, ForEachNode):
-        iterable = evaluate(node.iterable, local_scope if local_scope is not None else memory)
-        scope = local_scope if local_scope is not None else memory
-        for item in iterable:
-            scope[node.var_name] = item
-            result = evaluate(node.body, scope)
+            output.write(f"{value}\n")
+    return print_stmt
+
+
+def _compile_if(node, layout, interp):
+    condition = compile_node(node.condition, layout, interp)
+    then_block = compile_node(node.then_block, layout, interp)
+    else_block = compile_node(node.else_block, layout, interp) if node.else_block else None
+
+    def if_stmt(scope):
+        if condition(scope):
+            return then_block(scope)
+        elif else_block is not None:
+            return else_block(scope)
+    return if_stmt
+
+
+def _compile_for(node, layout, interp):
+    init = compile_node(node.init, layout, interp)
+    condition = compile_node(node.condition, layout, interp)
+    increment = compile_node(node.increment, layout, interp)
+    body = compile_node(node.body, layout, interp)
+
+    # For döngüsünde ana scope'u kullan, böylece x gibi dış değişkenler güncellenir
+    if completes_abruptly(node.body):
+        def loop(scope):
+            while condition(scope):
+                signal = body(scope)
+                if signal is not None:
+                    return signal
+                increment(scope)
+    else:
+        def loop(scope):
+            while condition(scope):
+                body(scope)
+                increment(scope)
+
+    counted = counted_loop(node)
+    if counted is None:
+        def for_stmt(scope):
+            init(scope)
+            return loop(scope)
+        return for_stmt
+    return _compile_counted_for(node, layout, interp, counted, init, body, loop)
+
+
+# for (int i = a; i < b; i = i + k) and its <=, - / >, >= variants, with a
+# literal or variable bound the body never assigns. Returns (counter, bound
+# node, step, inclusive) or None.
+def counted_loop(node):
+    init, condition, increment = node.init, node.condition, node.increment
+    if isinstance(init, VarDeclarationNode):
+        counter = init.name
+    elif isinstance(init, BinaryOpNode) and init.operator == '=' and isinstance(init.left, IdentifierNode):
+        counter = init.left.name
+    else:
+        return None
+    if not (isinstance(condition, BinaryOpNode) and condition.operator in ('<', '<=', '>', '>=')
+            and isinstance(condition.left, IdentifierNode) and condition.left.name == counter):
         return None
+    bound = condition.right
+    if not (isinstance(bound, LiteralNode) or (isinstance(bound, IdentifierNode) and bound.name != counter)):
+        return None
+    # i = i + k (artan) veya i = i - k (azalan), k pozitif int sabiti
+    if not (isinstance(increment, BinaryOpNode) and increment.operator == '='
+            and isinstance(increment.left, IdentifierNode) and increment.left.name == counter):
+        return None
+    step_expr = increment.right
+    if not (isinstance(step_expr, BinaryOpNode) and step_expr.operator in ('+', '-')
+            and isinstance(step_expr.left, IdentifierNode) and step_expr.left.name == counter
+            and isinstance(step_expr.right, LiteralNode) and type(step_expr.right.value) is int
+            and step_expr.right.value > 0):
+        return None
+    ascending = step_expr.operator == '+'
+    if ascending != (condition.operator in ('<', '<=')):
+        return None
+    assigned = set(assigned_names(node.body))
+    if counter in assigned or (isinstance(bound, IdentifierNode) and bound.name in assigned):
+        return None
+    step = step_expr.right.value if ascending else -step_expr.right.value
+    return counter, bound, step, condition.operator in ('<=', '>=')
 
-    elif isinstance(node, WhileNode):
-        while evaluate(node.condition, scope):
-            evaluate(node.body, scope)
-
-    elif isinstance(node, BlockNode):
-        result = None
-        for stmt in node.statements:
-            result = evaluate(stmt, scope)
-        return result
-
-    elif isinstance(node, FunctionDefNode):
-        functions[node.name] = node  # store the function definition
-
-    elif isinstance(node, FunctionCallNode):
-        # Method veya static method çağrısı: p.foo(1,2) veya ClassName.staticFoo(1,2)
-        if isinstance(node.name, BinaryOpNode) and node.name.operator == '.':
-            method_ref = evaluate(node.name, scope)
-            # Instance method
-            if isinstance(method_ref, tuple) and method_ref[0] == '__method__':
-                instance = method_ref[1]
-                method_def = method_ref[2]
-                local = {'this': instance}
-                for i, param in enumerate(method_def.params):
-                    local[param] = evaluate(node.args[i], scope)
-                try:
-                    evaluate(method_def.body, local)
-                except ReturnException as r:
-                    return r.value
-                return None
-            # Static method
-            elif isinstance(method_ref, tuple) and method_ref[0] == '__staticmethod__':
-                class_def = method_ref[1]
-                method_def = method_ref[2]
-                local = {}
-                for i, param in enumerate(method_def.params):
-                    local[param] = evaluate(node.args[i], scope)
+
+def _compile_counted_for(node, layout, interp, counted, init, body, loop):
+    counter, bound_node, step, inclusive = counted
+    load_counter = compile_node(IdentifierNode(counter), layout, interp)
+    load_bound = compile_node(bound_node, layout, interp)
+    store = _compile_store(counter, layout)
+    abrupt = completes_abruptly(node.body)
+
+    # Sayaç ve sınır int ise döngü Python range üzerinde çalışır; değilse
+    # (float, str, ...) normal koşul/artırma döngüsüne düşülür
+    def for_range(scope):
+        init(scope)
+        start = load_counter(scope)
+        stop = load_bound(scope)
+        if type(start) is not int or type(stop) is not int:
+            return loop(scope)
+        if inclusive:
+            stop += 1 if step > 0 else -1
+        values = range(start, stop, step)
+        if abrupt:
+            for value in values:
+                store(scope, value)
+                signal = body(scope)
+                if signal is not None:
+                    return signal
+        else:
+            for value in values:
+                store(scope, value)
+                body(scope)
+        # Son artırmanın bıraktığı değer: ilk başarısız koşuldaki sayaç
+        if values:
+            store(scope, values[-1] + step)
+    return for_range
+
+
+# Iterable of a for-each: a direct range()/keys()/items() call stays lazy
+def compile_iterable(node, layout, interp):
+    if not isinstance(node, FunctionCallNode) or isinstance(node.name, BinaryOpNode):
+        return compile_node(node, layout, interp)
+    name = node.name.name if isinstance(node.name, IdentifierNode) else node.name
+    builtin = BUILTINS.get(name)
+    if builtin is None:
+        return compile_node(node, layout, interp)
+    args = [compile_node(arg, layout, interp) for arg in node.args]
+    functions = interp.functions
+
+    def lazy_iterable(scope):
+        func = functions.get(name)
+        if func:
+            return call_function(func, [arg(scope) for arg in args])
+        return builtin(*[arg(scope) for arg in args])
+    return lazy_iterable
+
+
+def _compile_for_each(node, layout, interp):
+    if node.parallel:
+        return _compile_parallel_for_each(node, layout, interp)
+    iterable_fn = compile_iterable(node.iterable, layout, interp)
+    body = compile_node(node.body, layout, interp)
+    store = _compile_store(node.var_name, layout)
+
+    if completes_abruptly(node.body):
+        def for_each_signal(scope):
+            for item in iterable_fn(scope):
+                store(scope, item)
+                signal = body(scope)
+                if signal is not None:
+                    return signal
+        return for_each_signal
+
+    def for_each(scope):
+        for item in iterable_fn(scope):
+            store(scope, item)
+            body(scope)
+    return for_each
+
+
+def _compile_parallel_for_each(node, layout, interp):
+    local_names, slot_names = check_parallel_body(node)
+    body_names = referenced_names([node.body])
+    iterable_fn = compile_node(node.iterable, layout, interp)
+
+    if layout is None:
+        def parallel_for_each(scope):
+            run_parallel_for_each(interp, node, local_names, slot_names, body_names, list(iterable_fn(scope)), None)
+        return parallel_for_each
+
+    slots = list(layout.slots.items())
+
+    def parallel_for_each_frame(frame):
+        # Workers see the function's locals as a dict scope
+        outer = {name: frame[slot] for name, slot in slots if frame[slot] is not _MISSING}
+        run_parallel_for_each(interp, node, local_names, slot_names, body_names, list(iterable_fn(frame)), outer)
+    return parallel_for_each_frame
+
+
+def _compile_while(node, layout, interp):
+    condition = compile_node(node.condition, layout, interp)
+    body = compile_node(node.body, layout, interp)
+
+    if completes_abruptly(node.body):
+        def while_stmt_signal(scope):
+            while condition(scope):
+                signal = body(scope)
+                if signal is not None:
+                    return signal
+        return while_stmt_signal
+
+    def while_stmt(scope):
+        while condition(scope):
+            body(scope)
+    return while_stmt
+
+
+def _compile_block(node, layout, interp):
+    statements = [compile_node(stmt, layout, interp) for stmt in node.statements]
+    abrupt = [completes_abruptly(stmt) for stmt in node.statements]
+
+    if not any(abrupt):
+        def block(scope):
+            for stmt in statements:
+                stmt(scope)
+        return block
+
+    # Expression statements return plain values, so only check the others
+    steps = list(zip(statements, abrupt))
+
+    def block_signal(scope):
+        for stmt, check in steps:
+            signal = stmt(scope)
+            if check and signal is not None:
+                return signal
+    return block_signal
+
+
+def _compile_function_def(node, layout, interp):
+    func = compile_function(node, interp)
+    functions = interp.functions
+
+    def function_def(scope):
+        functions[func.name] = func  # store the function definition
+    return function_def
+
+
+def _compile_method_call(node, layout, interp):
+    # Method veya static method çağrısı: p.foo(1,2) veya ClassName.staticFoo(1,2)
+    left = compile_node(node.name.left, layout, interp)
+    method = node.name.right.name
+    static_name = node.name.left.name if isinstance(node.name.left, IdentifierNode) else None
+    args = [compile_node(arg, layout, interp) for arg in node.args]
+    get_member = interp.get_member
+    call_method = interp.call_method
+    push_receiver = interp.push_receiver
+    pop_receiver = interp.pop_receiver
+    private_access_allowed = interp.private_access_allowed
+    cache = {}      # id(methods) -> (methods, Function, is_private), or id(Class) -> (Class, static Function, False)
+    last = None     # entry of the last class seen
+
+    def method_call(scope):
+        nonlocal last
+        left_val = left(scope)
+        if type(left_val) is dict:
+            methods = left_val.get('__methods__')
+            entry = last
+            if entry is None or entry[0] is not methods:
+                entry = cache.get(id(methods))
+                if entry is not None and entry[0] is methods:
+                    last = entry
+                else:
+                    entry = None
+            # Instance alanı aynı isimli methodu gölgeleyebilir: o durumda genel yola düş
+            if entry is not None and method not in left_val and (not entry[2] or private_access_allowed(left_val)):
+                func = entry[1]
+                arg_values = [arg(scope) for arg in args]
+                if len(arg_values) < func.nparams:
+                    raise Exception(f"Function '{func.name}' expects {func.nparams} arguments, got {len(arg_values)}")
+                key = push_receiver(left_val)
                 try:
-                    evaluate(method_def.body, local)
-                except ReturnException as r:
-                    return r.value
-                return None
-            else:
-                raise Exception('Invalid method call')
-        # Normal fonksiyon çağrısı
-        func = functions.get(node.name)
+                    signal = func.body(func.make_frame(arg_values, left_val))
+                finally:
+                    pop_receiver(key)
+                return signal.value if signal is not None else None
+        elif type(left_val) is Class:
+            entry = cache.get(id(left_val))
+            if entry is not None and entry[0] is left_val and method not in left_val.static_props:
+                return call_function(entry[1], [arg(scope) for arg in args])
+        elif isinstance(left_val, str):
+            return call_string_method(left_val, method, [arg(scope) for arg in args])
+        method_ref = get_member(left_val, method, static_name)
+        # Instance method
+        if isinstance(method_ref, tuple) and method_ref[0] == '__method__':
+            if len(cache) < INLINE_CACHE_SIZE:
+                methods = left_val['__methods__']
+                last = cache[id(methods)] = (methods, method_ref[2], method in left_val.get('__private_methods__', ()))
+            return call_method(method_ref[2], [arg(scope) for arg in args], method_ref[1])
+        # Static method
+        elif isinstance(method_ref, tuple) and method_ref[0] == '__staticmethod__':
+            if type(left_val) is Class and len(cache) < INLINE_CACHE_SIZE:
+                cache[id(left_val)] = (left_val, method_ref[2], False)
+            return call_function(method_ref[2], [arg(scope) for arg in args])
+        raise Exception('Invalid method call')
+    return method_call
+
+
+def _compile_function_call(node, layout, interp):
+    if isinstance(node.name, BinaryOpNode) and node.name.operator == '.':
+        return _compile_method_call(node, layout, interp)
+    # Normal fonksiyon çağrısı
+    name = node.name.name if isinstance(node.name, IdentifierNode) else node.name
+    args = [compile_node(arg, layout, interp) for arg in node.args]
+    functions = interp.functions
+
+    def function_call(scope):
+        func = functions.get(name)
         if not func:
-            raise Exception(f"Function '{node.name}' not defined")
-        # Create local scope for function
-        local = {}
-        for i, param in enumerate(func.params):
-            local[param] = evaluate(node.args[i], scope)
-        try:
-            evaluate(func.body, local)
-        except ReturnException as r:
-            return r.value
-        return None
+            return call_builtin(name, [arg(scope) for arg in args])
+        return call_function(func, [arg(scope) for arg in args])
+    return function_call
 
-    elif isinstance(node, ReturnNode):
-        value = evaluate(node.value, scope)
-        raise ReturnException(value)
 
-    else:
+def _compile_return(node, layout, interp):
+    value_fn = compile_node(node.value, layout, interp)
+
+    if layout is None:
+        def return_outside_function(scope):
+            raise Exception("[Line ?, Column ?] Syntax Error: 'return' outside function")
+        return return_outside_function
+
+    def return_stmt(frame):
+        return ReturnSignal(value_fn(frame))
+    return return_stmt
+
+
+_COMPILERS = {
+    MapNode: _compile_map,
+    IndexAccessNode: _compile_index,
+    TryCatchNode: _compile_try_catch,
+    ClassInstanceNode: _compile_class_instance,
+    ClassDefNode: _compile_class_def,
+    NewInstanceNode: _compile_new_instance,
+    ArrayNode: _compile_array,
+    LiteralNode: _compile_literal,
+    StringNode: _compile_string,
+    InputNode: _compile_input,
+    IdentifierNode: _compile_identifier,
+    BinaryOpNode: _compile_binary,
+    VarDeclarationNode: _compile_var_declaration,
+    PrintNode: _compile_print,
+    IfNode: _compile_if,
+    ForNode: _compile_for,
+    ForEachNode: _compile_for_each,
+    WhileNode: _compile_while,
+    BlockNode: _compile_block,
+    FunctionDefNode: _compile_function_def,
+    FunctionCallNode: _compile_function_call,
+    ReturnNode: _compile_return,
+}
+
+
+def compile_node(node, layout, interp):
+    compiler = _COMPILERS.get(type(node))
+    if compiler is None:
         raise Exception(f"Unknown node type: {type(node)} (name: {type(node).__name__}, content: {node})")
+    return compiler(node, layout, interp)
 
 
-def run(ast):
-    for node in ast:
-        evaluate(node)
\ No newline at end of file
+# Run a program on interp, or on a fresh Interpreter
+def run(ast, interp=None):
+    owned = interp is None
+    if owned:
+        interp = Interpreter()
+    try:
+        interp.run(ast)
+    finally:
+        if owned:
+            interp.close()
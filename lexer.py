@@ -5,7 +5,7 @@ import re
 
 TOKENS = [
     # Keywords
-    ('KEYWORD', r'\b(fn|if|else|elseif|for|while|class|return|input|print|this|static|private|public|constructor|new|try|catch|in)\b'),
+    ('KEYWORD', r'\b(fn|if|else|elseif|for|while|class|return|input|print|this|static|private|public|constructor|new|try|catch|in|parallel)\b'),
 
     # Logical operators as keywords (and/or)
     ('LOGIC', r'\b(and|or)\b'),
@@ -38,65 +38,59 @@ TOKENS = [
     ('LBRACKET', r'\['),
     ('RBRACKET', r'\]'),
     
+    # Comments (ignored). Listed before OP so '//' and '/*' win over '/';
+    # STRING is matched first at a '"' so comment markers inside strings stay intact.
+    # Single-line comment: // ...
+    ('COMMENT_SLASH', r'//.*'),
+    # Hash comment: # ...
+    ('COMMENT_HASH', r'\#.*'),
+    # Multi-line comment: /* ... */
+    ('COMMENT_BLOCK', r'/\*[\s\S]*?\*/'),
+
     # Operators (add && and ||)
     ('OP', r'\^|==|!=|<=|>=|=|<|>|\+|\-|\*|\/|&&|\|\|'),
 
     # Colon for map/dictionary literals
     ('COLON', r':'),
 
-    # Whitespace and comments (ignored)
+    # Whitespace (ignored)
     ('NEWLINE', r'\n'),
     ('SKIP', r'[ \t]+'),
-    # Single-line comment: // ...
-    ('COMMENT_SLASH', r'//.*'),
-    # Hash comment: # ...
-    ('COMMENT_HASH', r'\#.*'),
-    # Multi-line comment: /* ... */
-    ('COMMENT_BLOCK', r'/\*[\s\S]*?\*/')
 ]
 
-
-# Yorumları (// ve #) satırın herhangi bir yerinde algılamak için kodu ön işle
-def remove_comments(code):
-    import re
-    # Remove /* ... */
-    code = re.sub(r'/\*[\s\S]*?\*/', '', code)
-    # Remove // ... (from // to end of line)
-    code = re.sub(r'//.*', '', code)
-    # Remove # ... (from # to end of line)
-    code = re.sub(r'#.*', '', code)
-    return code
-
 TOKEN_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKENS))
 
-# Lexer function
-def lexer(code):
-    tokens = []
-    code = remove_comments(code)
-    line_starts = [0]
-    for i, c in enumerate(code):
-        if c == '\n':
-            line_starts.append(i + 1)
+# Generator lexer: yields tokens one at a time so the parser can pull them on demand
+def tokenize(code):
+    # Yorumlar da TOKEN_RE ile tek geçişte atlanır, kaynak kopyalanmaz
+    # Satır ve sütun numarası: satır sayacı finditer boyunca artırılır
+    line = 1
+    line_start = 0
     for match in TOKEN_RE.finditer(code):
         kind = match.lastgroup
         value = match.group()
         start = match.start()
-        # Satır ve sütun numarasını bul
-        line = 1
-        for i, ls in enumerate(line_starts):
-            if start < ls:
-                break
-            line = i + 1
-        column = start - line_starts[line - 1] + 1
-
-        # Skip whitespace, newlines, and comments
-        if kind in ('NEWLINE', 'SKIP', 'COMMENT_SLASH', 'COMMENT_HASH', 'COMMENT_BLOCK'):
+
+        if kind == 'NEWLINE':
+            line += 1
+            line_start = match.end()
+            continue
+        # Skip whitespace and comments (block comments may span lines)
+        if kind in ('SKIP', 'COMMENT_SLASH', 'COMMENT_HASH', 'COMMENT_BLOCK'):
+            newlines = value.count('\n')
+            if newlines:
+                line += newlines
+                line_start = start + value.rindex('\n') + 1
             continue
+        column = start - line_start + 1
 
         # Remove quotes from strings
         if kind == 'STRING':
             value = value[1:-1]
 
-        tokens.append((kind, value, line, column))
+        yield (kind, value, line, column)
 
-    return tokens
+
+# Lexer function: full token list
+def lexer(code):
+    return list(tokenize(code))
@@ -1,17 +1,64 @@
+import argparse
 import sys
-from lexer import lexer
+from lexer import tokenize
 from parser import parse_program
-from interpreter import run
+from cache import parse_cached
+from optimizer import optimize
+import interpreter
+import vm
 
-if len(sys.argv) < 2:
-    print("Kullanım: python main.py <kaynak_dosyası>")
-    sys.exit(1)
+ENGINES = {
+    'ast': interpreter.run,     # closure-compiled AST
+    'vm': vm.run,               # reference register bytecode VM (slower, for cross-checking)
+}
 
-filename = sys.argv[1]
-with open(filename, "r", encoding="utf-8") as f:
-    code = f.read()
 
-tokens = lexer(code)
-ast = parse_program(tokens)
+# Source file -> AST the engines run, shared with batch.py and benchmark.py
+def load_program(path, use_cache=True, optimized=True):
+    with open(path, "r", encoding="utf-8") as f:
+        code = f.read()
+    ast = parse_cached(path, code) if use_cache else parse_program(tokenize(code))
+    return optimize(ast) if optimized else ast
 
-run(ast)
\ No newline at end of file
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='main.py', description='Glamerio interpreter')
+    arg_parser.add_argument('filename', metavar='kaynak_dosyası')
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default='ast',
+                            help='execution engine (default: ast; vm is a slower reference VM)')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='always re-parse instead of using __glamcache__')
+    arg_parser.add_argument('--no-optimize', action='store_true',
+                            help='skip constant folding and dead-branch pruning')
+    arg_parser.add_argument('--output', metavar='FILE',
+                            help='write print output to FILE instead of stdout')
+    arg_parser.add_argument('--unbuffered', action='store_true',
+                            help='write every print immediately instead of in blocks')
+    arg_parser.add_argument('--memo-stats', action='store_true',
+                            help="print cache hits/misses of 'fn memo' functions to stderr")
+    arg_parser.add_argument('--parallel', choices=interpreter.PARALLEL_BACKENDS, default='thread',
+                            help="worker pool for 'parallel for' loops (default: thread)")
+    args = arg_parser.parse_args(argv)
+
+    ast = load_program(args.filename, not args.no_cache, not args.no_optimize)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    interp = interpreter.Interpreter(interpreter.OutputSink(out, buffer_size=0 if args.unbuffered else 65536),
+                                     parallel=args.parallel)
+    try:
+        ENGINES[args.engine](ast, interp)
+        if args.memo_stats:
+            for name, stats in interp.memo_stats().items():
+                print(f"memo {name}: {stats['hits']} hits, {stats['misses']} misses, "
+                      f"{stats['size']}/{stats['maxsize']} entries", file=sys.stderr)
+    finally:
+        interp.close()
+        if out is not None:
+            out.close()
+    return 0
+
+
+# Worker processes of '--parallel process' import this module again under
+# spawn/forkserver; only the real entry point may run a program.
+if __name__ == '__main__':
+    sys.exit(main())
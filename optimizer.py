@@ -0,0 +1,115 @@
+# ---------------------------------------------
+# Glamerio AST optimizer - optimizer.py
+# Runs between parse_program and the engines:
+# - folds BinaryOpNode subtrees whose operands are literals, using the
+#   interpreter's own binary_op so '^', string '+' and auto conversion
+#   behave exactly as at runtime
+# - prunes if/while statements whose condition is a constant, before
+#   looking inside them, so dead code is never folded
+# Operations that would fail (1 / 0, "a" - 1) are left for runtime, so
+# errors are still raised when and where the program reaches them, and so
+# are results too large to keep in the AST ("x" * 1000000).
+# ---------------------------------------------
+
+from glam_ast import *
+from interpreter import binary_op
+
+# Larger integer powers and strings are left to runtime instead of growing the AST
+MAX_FOLDED_EXPONENT = 1024
+MAX_FOLDED_LENGTH = 4096
+
+
+def optimize(ast):
+    return _optimize_statements(ast)
+
+
+def _optimize_statements(statements):
+    result = []
+    for stmt in statements:
+        stmt = _optimize(stmt)
+        # Boş kalan bloklar (budanmış if/while) atlanır
+        if isinstance(stmt, BlockNode) and not stmt.statements:
+            continue
+        result.append(stmt)
+    return result
+
+
+def _is_constant(node):
+    return isinstance(node, (LiteralNode, StringNode))
+
+
+def _constant_node(value):
+    if isinstance(value, str):
+        return StringNode(value)
+    return LiteralNode(value)
+
+
+def _optimize(node):
+    if isinstance(node, BlockNode):
+        node.statements = _optimize_statements(node.statements)
+        return node
+    # Koşul sabitse çalışmayacak dal hiç optimize edilmez
+    if isinstance(node, IfNode):
+        node.condition = _optimize(node.condition)
+        if _is_constant(node.condition):
+            if node.condition.value:
+                return _optimize(node.then_block)
+            return _optimize(node.else_block) if node.else_block is not None else BlockNode([])
+        node.then_block = _optimize(node.then_block)
+        if node.else_block is not None:
+            node.else_block = _optimize(node.else_block)
+        return node
+    if isinstance(node, WhileNode):
+        node.condition = _optimize(node.condition)
+        if _is_constant(node.condition) and not node.condition.value:
+            return BlockNode([])
+        node.body = _optimize(node.body)
+        return node
+    if isinstance(node, BinaryOpNode):
+        node.left = _optimize(node.left)
+        # False && x, True || x: sağ taraf hiç çalışmaz
+        if (node.operator in ('and', '&&', 'or', '||') and _is_constant(node.left)
+                and bool(node.left.value) == (node.operator in ('or', '||'))):
+            return LiteralNode(bool(node.left.value))
+        node.right = _optimize(node.right)
+        return _fold_binary(node)
+    replace_child_nodes(node, _optimize)
+    return node
+
+
+def _too_large(op, left, right):
+    if op == '^':
+        # Tam sayı kuvvetleri: sonuç yaklaşık bit_length * üs bit tutar
+        return (isinstance(left, int) and isinstance(right, int) and abs(left) > 1
+                and (right > MAX_FOLDED_EXPONENT or left.bit_length() * right > MAX_FOLDED_LENGTH * 8))
+    if op == '*':
+        for text, count in ((left, right), (right, left)):
+            if isinstance(text, str) and isinstance(count, int) and len(text) * count > MAX_FOLDED_LENGTH:
+                return True
+    return False
+
+
+def _fold_binary(node):
+    op = node.operator
+    left = node.left
+    right = node.right
+    if op in ('and', '&&', 'or', '||'):
+        # Sol taraf sabitse sonuç sağ tarafa bakmadan bellidir: False && x, True || x
+        if _is_constant(left) and bool(left.value) == (op in ('or', '||')):
+            return LiteralNode(bool(left.value))
+        if _is_constant(left) and _is_constant(right):
+            return LiteralNode(binary_op(op, left.value, right.value))
+        return node
+    if op in ('=', '.') or not (_is_constant(left) and _is_constant(right)):
+        return node
+    if _too_large(op, left.value, right.value):
+        return node
+    try:
+        value = binary_op(op, left.value, right.value)
+    except Exception:
+        return node
+    if value is not None and not isinstance(value, (bool, int, float, str)):
+        return node
+    if isinstance(value, str) and len(value) > MAX_FOLDED_LENGTH:
+        return node
+    return _constant_node(value)
@@ -35,27 +35,37 @@ def parse_try_catch_statement(stream):
 
 
 
+from collections import deque
+
 from lexer import lexer  # Import lexer function
 
 # ----------------------
 # Token Stream Class
 # ----------------------
+# Tokens are pulled lazily from any iterable (a list or the tokenize()
+# generator) into a small lookahead buffer; consumed tokens are dropped.
 class TokenStream:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.position = 0
-
-    def peek(self):
-        return self.tokens[self.position] if self.position < len(self.tokens) else None
+        self._source = iter(tokens)
+        self._buffer = deque()
+        self.position = 0   # number of tokens consumed so far
+
+    def peek(self, offset=0):
+        buffer = self._buffer
+        while len(buffer) <= offset:
+            token = next(self._source, None)
+            if token is None:
+                return None
+            buffer.append(token)
+        return buffer[offset]
 
     def consume(self, expected_type=None):
         token = self.peek()
         if token is None:
             raise Exception(f"[Line ?, Column ?] Unexpected end of input (probably missing a closing bracket or statement)")
-        line = token[2] if len(token) > 2 else '?'
-        column = token[3] if len(token) > 3 else '?'
         if expected_type and token[0] != expected_type:
-            raise Exception(f"[Line {line}, Column {column}] Syntax Error: Expected token type '{expected_type}', but got '{token[0]}' (value: {token[1]})")
+            raise Exception(f"[Line {token[2]}, Column {token[3]}] Syntax Error: Expected token type '{expected_type}', but got '{token[0]}' (value: {token[1]})")
+        self._buffer.popleft()
         self.position += 1
         return token
 
@@ -67,6 +77,13 @@ class TokenStream:
 
 # For-each node
 def parse_for_each_statement(stream):
+    parallel = False
+    token = stream.peek()
+    if token[0] == 'KEYWORD' and token[1] == 'parallel':
+        stream.consume('KEYWORD')  # 'parallel'
+        if not is_for_each_syntax(stream):
+            raise Exception(f"[Line {token[2]}, Column {token[3]}] Syntax Error: 'parallel' must be followed by a for-each loop: parallel for (x in items)")
+        parallel = True
     stream.consume('KEYWORD')  # 'for'
     stream.consume('LPAREN')
     if stream.peek()[0] == 'TYPE':
@@ -109,7 +126,7 @@ def parse_for_each_statement(stream):
             column = token[3] if token and len(token) > 3 else '?'
             raise Exception(f"[Line {line}, Column {column}] Unsupported inline for-each statement: {token}")
         body = BlockNode([stmt])
-    return ForEachNode(var_type, var_name, iterable, body)
+    return ForEachNode(var_type, var_name, iterable, body, parallel)
 
 # ----------------------
 # Expression Parsers (with precedence)
@@ -117,76 +134,39 @@ def parse_for_each_statement(stream):
 
 
 
-# Logical OR precedence: or, ||
-def parse_logical_or(stream):
-    left = parse_logical_and(stream)
-    while stream.peek() and (
-        (stream.peek()[0] == 'LOGIC' and stream.peek()[1] == 'or') or
-        (stream.peek()[0] == 'OP' and stream.peek()[1] == '||')
-    ):
-        if stream.peek()[0] == 'LOGIC':
-            op = stream.consume()[1]
-        else:
-            op = stream.consume()[1]
-        right = parse_logical_and(stream)
-        left = BinaryOpNode(left, op, right)
-    return left
-
-# Logical AND precedence: and, &&
-def parse_logical_and(stream):
-    left = parse_comparison(stream)
-    while stream.peek() and (
-        (stream.peek()[0] == 'LOGIC' and stream.peek()[1] == 'and') or
-        (stream.peek()[0] == 'OP' and stream.peek()[1] == '&&')
-    ):
-        if stream.peek()[0] == 'LOGIC':
-            op = stream.consume()[1]
-        else:
-            op = stream.consume()[1]
-        right = parse_comparison(stream)
-        left = BinaryOpNode(left, op, right)
-    return left
-
-# Comparison precedence: <, >, <=, >=, ==, !=
-def parse_comparison(stream):
-    left = parse_additive(stream)
-    while stream.peek() and stream.peek()[0] == 'OP' and stream.peek()[1] in ('<', '>', '<=', '>=', '==', '!='):
-        op = stream.consume()[1]
-        right = parse_additive(stream)
-        left = BinaryOpNode(left, op, right)
-    return left
-
-# Additive precedence: + -
-def parse_additive(stream):
-    left = parse_term(stream)
-    while stream.peek() and stream.peek()[0] == 'OP' and stream.peek()[1] in ('+', '-'):
-        op = stream.consume()[1]
-        right = parse_term(stream)
-        left = BinaryOpNode(left, op, right)
-    return left
-
-# parse_expression now starts with logical or
-def parse_expression(stream):
-    return parse_logical_or(stream)
-
-# Medium precedence: * /
-def parse_term(stream):
-    left = parse_power(stream)
-    while stream.peek() and stream.peek()[0] == 'OP' and stream.peek()[1] in ('*', '/'):
-        op = stream.consume()[1]
-        right = parse_power(stream)
-        left = BinaryOpNode(left, op, right)
-    return left
-
-# High precedence: ^
+# Binary operator precedence, lowest to highest:
+#   or ||  <  and &&  <  comparisons  <  + -  <  * /  <  ^
+BINARY_PRECEDENCE = {
+    'or': 1, '||': 1,
+    'and': 2, '&&': 2,
+    '<': 3, '>': 3, '<=': 3, '>=': 3, '==': 3, '!=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5,
+    '^': 6,
+}
 # RIGHT-associative: a ^ b ^ c → a ^ (b ^ c)
-def parse_power(stream):
+RIGHT_ASSOCIATIVE = {'^'}
+OPERATOR_TOKENS = {'OP', 'LOGIC'}
+
+
+# Precedence climbing: one loop replaces the old or → and → comparison →
+# additive → term → power chain and builds the same BinaryOpNode trees
+def parse_expression(stream, min_precedence=1):
     left = parse_factor(stream)
-    while stream.peek() and stream.peek()[0] == 'OP' and stream.peek()[1] == '^':
-        op = stream.consume()[1]
-        right = parse_power(stream)  # right-associative
+    while True:
+        token = stream.peek()
+        if token is None or token[0] not in OPERATOR_TOKENS:
+            return left
+        op = token[1]
+        precedence = BINARY_PRECEDENCE.get(op)
+        if precedence is None or precedence < min_precedence:
+            return left
+        stream.consume()
+        if op in RIGHT_ASSOCIATIVE:
+            right = parse_expression(stream, precedence)
+        else:
+            right = parse_expression(stream, precedence + 1)
         left = BinaryOpNode(left, op, right)
-    return left
 
 def parse_input_expression(stream):
     stream.consume('KEYWORD')  # 'input'
@@ -288,7 +268,6 @@ def parse_factor(stream):
         args = []
         if stream.peek() and stream.peek()[0] == 'LPAREN':
             stream.consume('LPAREN')
-            print(f"DEBUG: parse_factor: after consume '(', peek: {stream.peek()}")
             if stream.peek() and stream.peek()[0] != 'RPAREN':
                 while True:
                     args.append(parse_expression(stream))
@@ -297,9 +276,7 @@ def parse_factor(stream):
                     else:
                         break
             stream.consume('RPAREN')
-            print(f"DEBUG: parse_factor: after consume ')', peek: {stream.peek()}")
         base = NewInstanceNode(class_name, args) if args else NewInstanceNode(class_name)
-        print(f"DEBUG: parse_factor: created NewInstanceNode({class_name}, args={args}), peek: {stream.peek()}")
         # Zincirli erişim: .prop, .method(), [index] gibi
         while True:
             token2 = stream.peek()
@@ -347,13 +324,15 @@ def parse_factor(stream):
                     break
         stream.consume('RBRACKET')
         return ArrayNode(elements)
+    # Literals are decoded to Python values once here, not on every evaluation
     elif token[0] == 'BOOL':
-        return LiteralNode(stream.consume()[1])  # 'True' or 'False'
+        return LiteralNode(stream.consume()[1] == 'True')
     elif token[0] == 'NULL':
         stream.consume()
-        return LiteralNode('null')
+        return LiteralNode(None)
     elif token[0] == 'NUMBER':
-        return LiteralNode(stream.consume()[1])
+        value = stream.consume()[1]
+        return LiteralNode(float(value) if '.' in value else int(value))
     elif token[0] == 'STRING':
         return StringNode(stream.consume()[1])
     elif token[0] == 'ID':
@@ -435,7 +414,7 @@ def parse_class_block(stream):
                 while True:
                     if stream.peek()[0] == 'TYPE':
                         stream.consume('TYPE')
-                    elif stream.peek()[0] == 'ID' and stream.tokens[stream.position+1][0] == 'ID':
+                    elif stream.peek()[0] == 'ID' and stream.peek(1)[0] == 'ID':
                         stream.consume('ID')
                     param_name = stream.consume('ID')[1]
                     params.append(param_name)
@@ -473,7 +452,7 @@ def parse_class_block(stream):
                     while True:
                         if stream.peek()[0] == 'TYPE':
                             stream.consume('TYPE')
-                        elif stream.peek()[0] == 'ID' and stream.tokens[stream.position+1][0] == 'ID':
+                        elif stream.peek()[0] == 'ID' and stream.peek(1)[0] == 'ID':
                             stream.consume('ID')
                         param_name = stream.consume('ID')[1]
                         params.append(param_name)
@@ -486,7 +465,7 @@ def parse_class_block(stream):
                 stmts.append(FunctionDefNode(func_name, params, body, is_static, is_private, func_is_constructor or is_constructor))
                 continue
         # Eğer ilk token ID ve ardından LPAREN geliyorsa (method): tip yok, isim var
-        elif stream.peek()[0] == 'ID' and stream.position + 1 < len(stream.tokens) and stream.tokens[stream.position+1][0] == 'LPAREN':
+        elif stream.peek()[0] == 'ID' and stream.peek(1) and stream.peek(1)[0] == 'LPAREN':
             name_token = stream.consume('ID')[1]
             type_token = None
             # Method
@@ -496,7 +475,7 @@ def parse_class_block(stream):
                 while True:
                     if stream.peek()[0] == 'TYPE':
                         stream.consume('TYPE')
-                    elif stream.peek()[0] == 'ID' and stream.tokens[stream.position+1][0] == 'ID':
+                    elif stream.peek()[0] == 'ID' and stream.peek(1)[0] == 'ID':
                         stream.consume('ID')
                     param_name = stream.consume('ID')[1]
                     params.append(param_name)
@@ -520,7 +499,7 @@ def parse_class_block(stream):
                     while True:
                         if stream.peek()[0] == 'TYPE':
                             stream.consume('TYPE')
-                        elif stream.peek()[0] == 'ID' and stream.tokens[stream.position+1][0] == 'ID':
+                        elif stream.peek()[0] == 'ID' and stream.peek(1)[0] == 'ID':
                             stream.consume('ID')
                         param_name = stream.consume('ID')[1]
                         params.append(param_name)
@@ -549,7 +528,7 @@ def parse_class_block(stream):
                     # Parametre tipi (isteğe bağlı, atla)
                     if stream.peek()[0] == 'TYPE':
                         stream.consume('TYPE')
-                    elif stream.peek()[0] == 'ID' and stream.tokens[stream.position+1][0] == 'ID':
+                    elif stream.peek()[0] == 'ID' and stream.peek(1)[0] == 'ID':
                         stream.consume('ID')
                     param_name = stream.consume('ID')[1]
                     params.append(param_name)
@@ -633,7 +612,8 @@ def parse_assignment_expression(stream):
     # Assignment expression: ID = expr, right-associative
     if stream.peek()[0] == 'ID':
         # Lookahead for '='
-        if stream.position + 1 < len(stream.tokens) and stream.tokens[stream.position+1][0] == 'OP' and stream.tokens[stream.position+1][1] == '=':
+        next_token = stream.peek(1)
+        if next_token and next_token[0] == 'OP' and next_token[1] == '=':
             name = stream.consume('ID')[1]
             stream.consume('OP')  # '='
             value = parse_assignment_expression(stream)
@@ -771,8 +751,31 @@ def parse_while_statement(stream):
     body = parse_block(stream)
     return WhileNode(condition, body)
 
+MEMO_DEFAULT_SIZE = 1024
+
+
+def is_memo_modifier(stream):
+    # 'fn memo fib(...)' veya 'fn memo(256) fib(...)'; 'fn memo(x)' ise memo adlı bir fonksiyondur
+    token = stream.peek()
+    if token is None or token[0] != 'ID' or token[1] != 'memo':
+        return False
+    kinds = [stream.peek(i)[0] if stream.peek(i) else None for i in (1, 2, 3, 4)]
+    return kinds[0] == 'ID' or kinds == ['LPAREN', 'NUMBER', 'RPAREN', 'ID']
+
+
 def parse_function_definition(stream):
     stream.consume('KEYWORD')  # 'fn'
+    memo = None
+    if is_memo_modifier(stream):
+        stream.consume('ID')  # 'memo'
+        memo = MEMO_DEFAULT_SIZE
+        if stream.peek()[0] == 'LPAREN':
+            stream.consume('LPAREN')
+            token = stream.consume('NUMBER')
+            if '.' in token[1] or int(token[1]) < 1:
+                raise Exception(f"[Line {token[2]}, Column {token[3]}] Syntax Error: memo size must be a positive integer, got {token[1]}")
+            memo = int(token[1])
+            stream.consume('RPAREN')
     name = stream.consume('ID')[1]
     stream.consume('LPAREN')
 
@@ -788,7 +791,7 @@ def parse_function_definition(stream):
 
     stream.consume('RPAREN')
     body = parse_block(stream)
-    return FunctionDefNode(name, params, body)
+    return FunctionDefNode(name, params, body, memo=memo)
 
 def parse_return_statement(stream):
     stream.consume('KEYWORD')  # 'return'
@@ -816,16 +819,13 @@ def parse_function_call(stream):
 
 # for-each ile klasik for ayrımını yapan yardımcı fonksiyon
 def is_for_each_syntax(stream):
-    pos = stream.position
     try:
         if stream.peek()[0] == 'KEYWORD' and stream.peek()[1] == 'for':
-            if stream.tokens[pos+1][0] == 'LPAREN':
-                idx = pos+2
-                if stream.tokens[idx][0] == 'TYPE':
+            if stream.peek(1)[0] == 'LPAREN':
+                idx = 2
+                if stream.peek(idx)[0] == 'TYPE':
                     idx += 1
-                if stream.tokens[idx][0] == 'ID' and stream.tokens[idx+1][0] == 'KEYWORD' and stream.tokens[idx+1][1] == 'in':
-                    return True
-                if stream.tokens[idx][0] == 'ID' and stream.tokens[idx+1][0] == 'KEYWORD' and stream.tokens[idx+1][1] == 'in':
+                if stream.peek(idx)[0] == 'ID' and stream.peek(idx+1)[0] == 'KEYWORD' and stream.peek(idx+1)[1] == 'in':
                     return True
     except Exception:
         pass
@@ -871,7 +871,6 @@ def parse_block(stream):
             statements.append(node)
         elif token[0] == 'ID' or (token[0] == 'KEYWORD' and token[1] == 'this'):
             # Fonksiyon çağrısı mı yoksa atama mı? (this.x = ... veya this.method(...))
-            start_pos = stream.position
             # this veya id ile başlayan bir ifade
             expr = parse_expression(stream)
             # Atama mı?
@@ -893,6 +892,9 @@ def parse_block(stream):
         elif token[0] == 'KEYWORD' and token[1] == 'for' and is_for_each_syntax(stream):
             node = parse_for_each_statement(stream)
             statements.append(node)
+        elif token[0] == 'KEYWORD' and token[1] == 'parallel':
+            node = parse_for_each_statement(stream)
+            statements.append(node)
         elif token[0] == 'KEYWORD' and token[1] == 'for':
             node = parse_for_statement(stream)
             statements.append(node)
@@ -914,7 +916,7 @@ def parse_program(tokens):
         token = stream.peek()
         # Yorum satırlarını atla (ID olarak gelirse ve '#' ile başlıyorsa)
         if token[0] == 'ID' and str(token[1]).startswith('#'):
-            stream.position += 1
+            stream.consume()
             continue
         if token[0] == 'TYPE':
             node = parse_variable_declaration(stream)
@@ -939,6 +941,10 @@ def parse_program(tokens):
             node = parse_for_each_statement(stream)
             ast_nodes.append(node)
             continue
+        if token[0] == 'KEYWORD' and token[1] == 'parallel':
+            node = parse_for_each_statement(stream)
+            ast_nodes.append(node)
+            continue
         if token[0] == 'KEYWORD' and token[1] == 'for':
             node = parse_for_statement(stream)
             ast_nodes.append(node)
@@ -960,7 +966,7 @@ def parse_program(tokens):
             ast_nodes.append(node)
             # Class tanımı sonrası, bir sonraki statement'a kadar ilerle
             while stream.peek() and stream.peek()[0] not in ('TYPE', 'KEYWORD', 'ID'):
-                stream.position += 1
+                stream.consume()
             continue
         if token[0] == 'KEYWORD' and token[1] == 'try':
             node = parse_try_catch_statement(stream)
@@ -986,7 +992,7 @@ def parse_program(tokens):
                 column = token_err[3] if token_err and len(token_err) > 3 else '?'
                 raise Exception(f"[Line {line}, Column {column}] Unexpected token in top-level after expression: {token_err}")
         # Yorum veya boş satır ise atla
-        stream.position += 1
+        stream.consume()
     return ast_nodes
 
 
@@ -995,7 +1001,7 @@ def parse_program(tokens):
 # ----------------------
 def print_ast(node):
     if isinstance(node, LiteralNode):
-        return node.value
+        return 'null' if node.value is None else str(node.value)
     elif isinstance(node, IdentifierNode):
         return node.name
     elif isinstance(node, StringNode):
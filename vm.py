@@ -0,0 +1,493 @@
+# ---------------------------------------------
+# Glamerio Bytecode VM - vm.py
+# Register-based reference implementation next to the closure engine in
+# interpreter.py. It is not a faster engine: every instruction pays for
+# one pass through the Python dispatch loop on top of the work the closure
+# engine does, so programs run 2-3x slower here. It stays selectable
+# (--engine vm) so the two compilers can be checked against each other.
+#
+# parse_program output is compiled into Code objects: a flat list of
+# (opcode, a, b, c) instructions plus constant and name tables. Operands
+# a/b/c are register numbers, table indexes or jump targets depending on
+# the opcode. Top-level variables live in the global memory dict. Inside
+# functions the low registers are the FrameLayout slots shared with the
+# closure engine, so locals are registers and temporaries sit above them.
+#
+# Nodes without a native encoding (classes, try/catch, member access,
+# method calls, maps, input) are compiled with interpreter.compile_node
+# and run through the EXEC opcode, so both engines share one runtime.
+# A Code object is bound to the Interpreter it was compiled for, whose
+# globals, functions and output the dispatch loop uses.
+# ---------------------------------------------
+
+import interpreter
+from interpreter import (FrameLayout, Function, Interpreter, ReturnSignal, binary_handler, call_builtin,
+                         call_function, compile_iterable, compile_node, memoize)
+from glam_ast import *
+
+_MISSING = interpreter._MISSING
+
+# Opcodes
+LOAD_NAME = 0       # regs[a] = names[b] from scope -> memory -> classes, c: (line, column) const
+LOAD_CONST = 1      # regs[a] = consts[b]
+STORE_NAME = 2      # scope[names[b]] = regs[a]
+LOAD_LOCAL = 3      # regs[a] = regs[b], falling back to globals if unset, c: (name, line, column) const
+LOAD_GLOBAL = 4     # regs[a] = names[b] from memory -> classes, c: (line, column) const
+MOVE = 5            # regs[a] = regs[b]
+CONVERT = 6         # int (b=1) / float (b=2) conversion of a str in regs[a]
+JUMP = 7            # pc = a
+JUMP_IF_FALSE = 8   # if not regs[a]: pc = b
+CALL = 9            # regs[a] = names[b](*regs[consts[c]])
+RETURN = 10         # return regs[a]
+PRINT = 11          # print(regs[a]) through the interpreter's output sink
+INDEX = 12          # regs[a] = regs[b][regs[c]]
+STORE_INDEX = 13    # regs[a][regs[b]] = regs[c]
+BUILD_ARRAY = 14    # regs[a] = [regs[r] for r in consts[b]]
+GET_ITER = 15       # regs[a] = iter(regs[b])
+FOR_ITER = 16       # regs[b] = next(regs[a]), on exhaustion pc = c
+DEFINE = 17         # functions[consts[a].name] = consts[a]
+EXEC = 18           # regs[a] = consts[b](scope), closure-compiled fallback
+EXEC_STMT = 19      # run statement closure consts[b](scope), returning if it signals a return
+HALT = 20           # return None
+TEST = 21           # regs[a] = bool(regs[b])
+JUMP_IF_TRUE = 22   # if regs[a]: pc = b
+
+# Binary operators: opcode encodes the operator, regs[a] = regs[b] <op> regs[c]
+BINARY_OPS = ('+', '-', '*', '/', '^', '==', '!=', '<', '<=', '>', '>=')
+BINARY_BASE = 32
+BINARY_OPCODES = {op: BINARY_BASE + i for i, op in enumerate(BINARY_OPS)}
+BINARY_HANDLERS = tuple(binary_handler(op) for op in BINARY_OPS)
+
+# Logical operators short-circuit with jumps instead of a binary opcode
+LOGICAL_JUMPS = {'and': JUMP_IF_FALSE, '&&': JUMP_IF_FALSE, 'or': JUMP_IF_TRUE, '||': JUMP_IF_TRUE}
+
+# Opcodes whose only effect is writing regs[a]; their target can be retargeted
+WRITES_A = {LOAD_NAME, LOAD_CONST, LOAD_LOCAL, LOAD_GLOBAL, MOVE, CALL, INDEX, BUILD_ARRAY, EXEC, TEST}
+WRITES_A.update(BINARY_OPCODES.values())
+
+OPCODE_NAMES = {
+    LOAD_NAME: 'LOAD_NAME', LOAD_CONST: 'LOAD_CONST', STORE_NAME: 'STORE_NAME', LOAD_LOCAL: 'LOAD_LOCAL',
+    LOAD_GLOBAL: 'LOAD_GLOBAL', MOVE: 'MOVE', CONVERT: 'CONVERT', JUMP: 'JUMP', JUMP_IF_FALSE: 'JUMP_IF_FALSE',
+    CALL: 'CALL', RETURN: 'RETURN', PRINT: 'PRINT', INDEX: 'INDEX', STORE_INDEX: 'STORE_INDEX',
+    BUILD_ARRAY: 'BUILD_ARRAY', GET_ITER: 'GET_ITER', FOR_ITER: 'FOR_ITER', DEFINE: 'DEFINE', EXEC: 'EXEC',
+    EXEC_STMT: 'EXEC_STMT', HALT: 'HALT', TEST: 'TEST', JUMP_IF_TRUE: 'JUMP_IF_TRUE',
+}
+for _op, _code in BINARY_OPCODES.items():
+    OPCODE_NAMES[_code] = f'BINARY {_op}'
+
+
+class Code:
+    def __init__(self, instructions, consts, names, nregs, interp):
+        self.instructions = instructions
+        self.consts = consts
+        self.names = names
+        self.nregs = nregs
+        self.interp = interp
+
+
+# ----------------------
+# Compiler
+# ----------------------
+class CodeBuilder:
+    def __init__(self, interp, layout=None):
+        # layout is the function's FrameLayout, None for top-level code
+        self.interp = interp
+        self.layout = layout
+        self.nlocals = layout.size if layout is not None else 0
+        self.instructions = []
+        self.consts = []
+        self.names = []
+        self._name_index = {}
+        self.labels = set()
+        self.nregs = self.nlocals
+        self._free = self.nlocals
+
+    def emit(self, op, a=0, b=0, c=0):
+        self.instructions.append((op, a, b, c))
+        return len(self.instructions) - 1
+
+    def patch(self, index, op, a=0, b=0, c=0):
+        self.instructions[index] = (op, a, b, c)
+
+    def here(self):
+        return len(self.instructions)
+
+    def label(self):
+        self.labels.add(self.here())
+        return self.here()
+
+    def const(self, value):
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def name(self, name):
+        if name not in self._name_index:
+            self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._name_index[name]
+
+    # Temporaries are allocated stack-wise; release() frees everything above mark
+    def alloc(self):
+        reg = self._free
+        self._free += 1
+        self.nregs = max(self.nregs, self._free)
+        return reg
+
+    def mark(self):
+        return self._free
+
+    def release(self, mark):
+        self._free = mark
+
+    def build(self):
+        self.emit(HALT)
+        return Code(self.instructions, self.consts, self.names, self.nregs, self.interp)
+
+    # Move a computed temporary into a local slot, retargeting the
+    # instruction that produced it when nothing jumps in between
+    def move(self, dst, src):
+        if dst == src:
+            return
+        last = self.instructions[-1] if self.instructions else None
+        if (src >= self.nlocals and last is not None and last[0] in WRITES_A and last[1] == src
+                and self.here() not in self.labels):
+            self.patch(self.here() - 1, last[0], dst, last[2], last[3])
+        else:
+            self.emit(MOVE, dst, src)
+
+    def store(self, name, reg):
+        # Returns the register that now holds the stored value
+        if self.layout is None:
+            self.emit(STORE_NAME, reg, self.name(name))
+            return reg
+        slot = self.layout.slots[name]
+        self.move(slot, reg)
+        return slot
+
+    def closure(self, node):
+        return self.const(compile_node(node, self.layout, self.interp))
+
+    # ---- statements ----
+    def statement(self, node):
+        mark = self.mark()
+        if isinstance(node, BlockNode):
+            for stmt in node.statements:
+                self.statement(stmt)
+        elif isinstance(node, VarDeclarationNode):
+            if node.value is not None:
+                reg = self.expression(node.value)
+                conversion = {'int': 1, 'float': 2}.get(node.var_type)
+                if conversion:
+                    if reg < self.nlocals:
+                        # Never convert a variable in place
+                        tmp = self.alloc()
+                        self.emit(MOVE, tmp, reg)
+                        reg = tmp
+                    self.emit(CONVERT, reg, conversion)
+            else:
+                reg = self.alloc()
+                self.emit(LOAD_CONST, reg, self.const(None))
+            self.store(node.name, reg)
+        elif isinstance(node, PrintNode):
+            self.emit(PRINT, self.expression(node.value))
+        elif isinstance(node, IfNode):
+            cond = self.expression(node.condition)
+            jump_else = self.emit(JUMP_IF_FALSE)
+            self.release(mark)
+            self.statement(node.then_block)
+            if node.else_block:
+                jump_end = self.emit(JUMP)
+                self.patch(jump_else, JUMP_IF_FALSE, cond, self.label())
+                self.statement(node.else_block)
+                self.patch(jump_end, JUMP, self.label())
+            else:
+                self.patch(jump_else, JUMP_IF_FALSE, cond, self.label())
+        elif isinstance(node, WhileNode):
+            start = self.label()
+            cond = self.expression(node.condition)
+            jump_end = self.emit(JUMP_IF_FALSE)
+            self.release(mark)
+            self.statement(node.body)
+            self.emit(JUMP, start)
+            self.patch(jump_end, JUMP_IF_FALSE, cond, self.label())
+        elif isinstance(node, ForNode):
+            self.statement(node.init)
+            start = self.label()
+            cond = self.expression(node.condition)
+            jump_end = self.emit(JUMP_IF_FALSE)
+            self.release(mark)
+            self.statement(node.body)
+            self.statement(node.increment)
+            self.emit(JUMP, start)
+            self.patch(jump_end, JUMP_IF_FALSE, cond, self.label())
+        elif isinstance(node, ForEachNode) and node.parallel:
+            self.emit(EXEC_STMT, 0, self.closure(node))
+        elif isinstance(node, ForEachNode):
+            if isinstance(node.iterable, FunctionCallNode) and not isinstance(node.iterable.name, BinaryOpNode):
+                # range()/keys()/items() stay lazy, as in the closure engine
+                iterable = self.alloc()
+                self.emit(EXEC, iterable, self.const(compile_iterable(node.iterable, self.layout, self.interp)))
+            else:
+                iterable = self.expression(node.iterable)
+            iterator = self.alloc()
+            self.emit(GET_ITER, iterator, iterable)
+            start = self.label()
+            if self.layout is not None:
+                # Item goes straight into the loop variable's slot
+                jump = self.emit(FOR_ITER)
+                item = self.layout.slots[node.var_name]
+            else:
+                item = self.alloc()
+                jump = self.emit(FOR_ITER)
+                self.emit(STORE_NAME, item, self.name(node.var_name))
+            self.statement(node.body)
+            self.emit(JUMP, start)
+            self.patch(jump, FOR_ITER, iterator, item, self.label())
+        elif isinstance(node, FunctionDefNode):
+            self.emit(DEFINE, self.const(compile_function(node, self.interp)))
+        elif isinstance(node, ReturnNode) and self.layout is not None:
+            self.emit(RETURN, self.expression(node.value))
+        elif isinstance(node, (ReturnNode, ClassDefNode, TryCatchNode)):
+            self.emit(EXEC_STMT, 0, self.closure(node))
+        else:
+            self.expression(node)
+        self.release(mark)
+
+    # ---- expressions: return the register holding the result ----
+    def expression(self, node):
+        if isinstance(node, LiteralNode):
+            reg = self.alloc()
+            self.emit(LOAD_CONST, reg, self.const(node.value))
+            return reg
+        if isinstance(node, StringNode):
+            reg = self.alloc()
+            self.emit(LOAD_CONST, reg, self.const(node.value))
+            return reg
+        if isinstance(node, IdentifierNode):
+            return self.identifier(node)
+        if isinstance(node, BinaryOpNode) and node.operator in BINARY_OPCODES:
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            reg = self.alloc()
+            self.emit(BINARY_OPCODES[node.operator], reg, left, right)
+            return reg
+        if isinstance(node, BinaryOpNode) and node.operator in LOGICAL_JUMPS:
+            return self.logical(node)
+        if isinstance(node, BinaryOpNode) and node.operator == '=' and isinstance(node.left, IdentifierNode):
+            return self.store(node.left.name, self.expression(node.right))
+        if isinstance(node, BinaryOpNode) and node.operator == '=' and isinstance(node.left, IndexAccessNode):
+            container = self.expression(node.left.list_expr)
+            index = self.expression(node.left.index_expr)
+            reg = self.expression(node.right)
+            self.emit(STORE_INDEX, container, index, reg)
+            return reg
+        if isinstance(node, IndexAccessNode):
+            container = self.expression(node.list_expr)
+            index = self.expression(node.index_expr)
+            reg = self.alloc()
+            self.emit(INDEX, reg, container, index)
+            return reg
+        if isinstance(node, ArrayNode):
+            elements = tuple(self.expression(el) for el in node.elements)
+            reg = self.alloc()
+            self.emit(BUILD_ARRAY, reg, self.const(elements))
+            return reg
+        if isinstance(node, FunctionCallNode) and not isinstance(node.name, BinaryOpNode):
+            name = node.name.name if isinstance(node.name, IdentifierNode) else node.name
+            args = tuple(self.expression(arg) for arg in node.args)
+            reg = self.alloc()
+            self.emit(CALL, reg, self.name(name), self.const(args))
+            return reg
+        # Everything else runs on the closure engine
+        reg = self.alloc()
+        self.emit(EXEC, reg, self.closure(node))
+        return reg
+
+    def logical(self, node):
+        # Both operands are written as bools into one result register; the
+        # label at the end keeps move() from retargeting either write
+        jump_op = LOGICAL_JUMPS[node.operator]
+        reg = self.alloc()
+        mark = self.mark()
+        self.emit(TEST, reg, self.expression(node.left))
+        self.release(mark)
+        jump_end = self.emit(jump_op)
+        self.emit(TEST, reg, self.expression(node.right))
+        self.release(mark)
+        self.patch(jump_end, jump_op, reg, self.label())
+        return reg
+
+    def identifier(self, node):
+        name = node.name
+        line = getattr(node, 'line', '?')
+        column = getattr(node, 'column', '?')
+        if self.layout is None:
+            reg = self.alloc()
+            self.emit(LOAD_NAME, reg, self.name(name), self.const((line, column)))
+            return reg
+        slot = self.layout.slots.get(name)
+        if slot is None:
+            reg = self.alloc()
+            self.emit(LOAD_GLOBAL, reg, self.name(name), self.const((line, column)))
+            return reg
+        if name in self.layout.definite:
+            return slot     # parameters are used in place
+        reg = self.alloc()
+        self.emit(LOAD_LOCAL, reg, slot, self.const((name, line, column)))
+        return reg
+
+
+def compile_function(node, interp):
+    layout = FrameLayout(node.params, node.body)
+    builder = CodeBuilder(interp, layout)
+    builder.statement(node.body)
+    code = builder.build()
+
+    # Closure-engine callers (call_function) expect a completion signal
+    def body(frame):
+        return ReturnSignal(execute(code, frame, frame))
+    func = Function(node, body, layout, code.nregs)
+    func.code = code
+    if node.memo:
+        memoize(func)
+    return func
+
+
+def compile_program(ast, interp):
+    builder = CodeBuilder(interp)
+    for node in ast:
+        builder.statement(node)
+    return builder.build()
+
+
+# ----------------------
+# Dispatch loop
+# ----------------------
+# scope is the memory dict for top-level code; function frames pass their
+# register list as both scope and regs so EXEC closures see the slots.
+def execute(code, scope, regs=None):
+    instructions = code.instructions
+    consts = code.consts
+    names = code.names
+    if regs is None:
+        regs = [None] * code.nregs
+    interp = code.interp
+    memory = interp.memory
+    functions = interp.functions
+    lookup_global = interp.lookup_global
+    pc = 0
+    while True:
+        op, a, b, c = instructions[pc]
+        pc += 1
+        if op >= BINARY_BASE:
+            regs[a] = BINARY_HANDLERS[op - BINARY_BASE](regs[b], regs[c])
+        elif op == LOAD_CONST:
+            regs[a] = consts[b]
+        elif op == MOVE:
+            regs[a] = regs[b]
+        elif op == JUMP_IF_FALSE:
+            if not regs[a]:
+                pc = b
+        elif op == JUMP:
+            pc = a
+        elif op == TEST:
+            regs[a] = bool(regs[b])
+        elif op == JUMP_IF_TRUE:
+            if regs[a]:
+                pc = b
+        elif op == LOAD_LOCAL:
+            value = regs[b]
+            if value is _MISSING:
+                value = lookup_global(*consts[c])
+            regs[a] = value
+        elif op == LOAD_GLOBAL:
+            value = memory.get(names[b], _MISSING)
+            if value is _MISSING:
+                value = lookup_global(names[b], *consts[c])
+            regs[a] = value
+        elif op == LOAD_NAME:
+            value = scope.get(names[b], _MISSING)
+            if value is _MISSING:
+                value = interp.lookup_name(names[b], scope, *consts[c])
+            regs[a] = value
+        elif op == STORE_NAME:
+            scope[names[b]] = regs[a]
+        elif op == CALL:
+            name = names[b]
+            func = functions.get(name)
+            args = [regs[r] for r in consts[c]]
+            if not func:
+                regs[a] = call_builtin(name, args)
+                continue
+            if func.code is None:
+                regs[a] = call_function(func, args)
+                continue
+            if len(args) < func.nparams:
+                raise Exception(f"Function '{func.name}' expects {func.nparams} arguments, got {len(args)}")
+            frame = func.make_frame(args)
+            regs[a] = execute(func.code, frame, frame)
+        elif op == RETURN:
+            return regs[a]
+        elif op == FOR_ITER:
+            value = next(regs[a], _MISSING)
+            if value is _MISSING:
+                pc = c
+            else:
+                regs[b] = value
+        elif op == INDEX:
+            regs[a] = regs[b][regs[c]]
+        elif op == STORE_INDEX:
+            regs[a][regs[b]] = regs[c]
+        elif op == CONVERT:
+            value = regs[a]
+            # Otomatik tip dönüşümü: int x = input(); gibi durumlar için
+            if b == 1 and isinstance(value, str):
+                try:
+                    regs[a] = int(value)
+                except Exception:
+                    raise Exception(f"Cannot convert input to int: {value}")
+            elif b == 2 and isinstance(value, str):
+                try:
+                    regs[a] = float(value)
+                except Exception:
+                    raise Exception(f"Cannot convert input to float: {value}")
+        elif op == PRINT:
+            value = regs[a]
+            interp.output.write('null\n' if value is None else f"{value}\n")
+        elif op == EXEC:
+            regs[a] = consts[b](scope)
+        elif op == EXEC_STMT:
+            signal = consts[b](scope)
+            if signal is not None:
+                return signal.value
+        elif op == BUILD_ARRAY:
+            regs[a] = [regs[r] for r in consts[b]]
+        elif op == GET_ITER:
+            regs[a] = iter(regs[b])
+        elif op == DEFINE:
+            func = consts[a]
+            functions[func.name] = func
+        elif op == HALT:
+            return None
+        else:
+            raise Exception(f"Unknown opcode: {op}")
+
+
+def disassemble(code):
+    lines = []
+    for pc, (op, a, b, c) in enumerate(code.instructions):
+        lines.append(f"{pc:4d} {OPCODE_NAMES.get(op, op):<16} {a} {b} {c}")
+    return '\n'.join(lines)
+
+
+# Run a program on interp, or on a fresh Interpreter
+def run(ast, interp=None):
+    owned = interp is None
+    if owned:
+        interp = Interpreter()
+    try:
+        execute(compile_program(ast, interp), interp.memory)
+    finally:
+        interp.output.flush()
+        if owned:
+            interp.close()